@@ -14,18 +14,30 @@ Changes for new architecture:
 """
 
 import os
+import re
 import sys
 import time
+import atexit
 import json
-import signal
 import logging
 import threading
+import queue
+
+from dataclasses import dataclass
+
+from io import BytesIO
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
 import urllib.request, urllib.error
-from urllib.parse import urlparse
 
-from termcolor import cprint
-import numpy as np
+from termcolor import cprint, colored
+
+try:
+    import orjson
+    HAS_ORJSON=True
+except ImportError:
+    HAS_ORJSON=False
 
 # NanoLLM stack (assumes your existing environment)
 from nano_llm import NanoLLM, ChatHistory, ChatTemplates, BotFunctions
@@ -34,8 +46,6 @@ from nano_llm.utils import ImageExtensions, ArgParser, KeyboardInterrupt, load_p
 # ---------------------------
 # Lightweight HTTP client (stdlib)
 # ---------------------------
-import urllib.request
-import urllib.error
 
 def _http_post_text(url: str, text: str, timeout: float = 6.0) -> tuple[int, str]:
     """
@@ -59,35 +69,90 @@ def _http_post_text(url: str, text: str, timeout: float = 6.0) -> tuple[int, str
     except Exception as e:
         return -1, str(e)
 
+# ---------------------------
+# Image URL prefetch
+# ---------------------------
+
+_MAX_IMAGE_BYTES = 25*1024*1024
+
+_URL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="url-prefetch")
+_URL_CACHE = {}       # url -> (expires, Future[bytes]); taken out by the turn that uses it
+_URL_CACHE_MAX = 8
+_URL_PREFETCH_TTL = 30.0      # unclaimed prefetches are dropped after this
+_URL_LOCK = threading.Lock()  # /describe prefetches from concurrent Flask threads
+
+def _download_bytes(url: str, timeout: float = 10.0, max_bytes: int = _MAX_IMAGE_BYTES) -> bytes:
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        data = resp.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ValueError(f"image is larger than {max_bytes} bytes")
+    return data
+
+def _prefetch_image_url(url: str):
+    """Start downloading an http(s) image in the background (no-op if already in-flight)."""
+    now = time.monotonic()
+    with _URL_LOCK:
+        for u in [u for u, (expires, _) in _URL_CACHE.items() if expires <= now]:
+            del _URL_CACHE[u]
+        if url in _URL_CACHE:
+            return
+        if len(_URL_CACHE) >= _URL_CACHE_MAX:
+            _URL_CACHE.pop(next(iter(_URL_CACHE)))
+        _URL_CACHE[url] = (now + _URL_PREFETCH_TTL, _URL_POOL.submit(_download_bytes, url))
+
+def _prefetched_image(url: str):
+    """
+    Return the prefetched image for 'url' as a PIL image, or None if it wasn't
+    prefetched, went stale or the download failed (the vision loader then fetches
+    it itself). The entry is consumed, so a later request for the same URL
+    (e.g. a camera snapshot endpoint) downloads a fresh frame.
+    """
+    with _URL_LOCK:
+        entry = _URL_CACHE.pop(url, None)
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    try:
+        from PIL import Image
+        image = Image.open(BytesIO(entry[1].result()))
+        image.load()
+        return image
+    except Exception as e:
+        cprint(f"[prefetch][warn] failed to prefetch {url}: {e}", "yellow")
+        return None
+
 # ---------------------------
 # Helpers for JSON by image (local only)
 # ---------------------------
 
-def _ext_of(path: str) -> str:
-    """Return the lowercase extension of a local path or URL."""
-    p = path.strip().strip("'").strip('"')
-    if p.lower().startswith(("http://", "https://")):
-        parsed = urlparse(p)
-        _, ext = os.path.splitext(parsed.path)
-        return ext.lower()
-    _, ext = os.path.splitext(p)
-    return ext.lower()
+# ImageExtensions may be like [".jpg", ".png", ...] or ["jpg","png",...] - normalize once at import
+_IMG_EXTS = frozenset(
+    (e if e.startswith(".") else f".{e}").lower()
+    for e in (ImageExtensions if isinstance(ImageExtensions, (list, set, tuple)) else [])
+) or frozenset({".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff", ".tif", ".gif"})
+
+# Image path/URL detection in one pass: optional quotes, a local path or http(s) URL
+# (with optional query/fragment) ending in one of the _IMG_EXTS extensions.
+_IMG_EXT_RE = "|".join(re.escape(e) for e in sorted(_IMG_EXTS, key=len, reverse=True))
+_IMG_RE = re.compile(
+    rf"""^\s*['"]*(?:https?://[^?#]+?(?:{_IMG_EXT_RE})(?:[?#].*)?|(?!https?://).+?(?:{_IMG_EXT_RE}))['"]*\s*$""",
+    re.IGNORECASE,
+)
+
+_QUOTES = "'\""
+
+def _unquote(text: str) -> str:
+    """Strip surrounding whitespace and quotes from a pasted path/URL."""
+    return text.strip().strip(_QUOTES)
 
 def _is_image_path_or_url(user_text: str) -> bool:
     """Detect if the user_text looks like an image path or image URL."""
-    if not user_text:
-        return False
-    ext = _ext_of(user_text)
-    normalized = {e if e.startswith(".") else f".{e}" for e in (ImageExtensions if isinstance(ImageExtensions, (list, set, tuple)) else [])}
-    if not normalized:
-        # Fallback if ImageExtensions is not provided
-        normalized = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff", ".tif", ".gif"}
-    return ext in normalized
+    return bool(user_text) and _IMG_RE.match(user_text) is not None
 
 def _json_path_for_image(image_path_or_url: str) -> str:
     """Return the JSON filename that corresponds to the image (next to it or derived from URL)."""
-    p = image_path_or_url.strip().strip("'").strip('"')
+    p = _unquote(image_path_or_url)
     if p.lower().startswith(("http://", "https://")):
+        from urllib.parse import urlparse  # only needed for URL images
         parsed = urlparse(p)
         base = os.path.basename(parsed.path) or "image"
         name, _ = os.path.splitext(base)
@@ -95,6 +160,61 @@ def _json_path_for_image(image_path_or_url: str) -> str:
     name, _ = os.path.splitext(p)
     return f"{name}.json"
 
+@dataclass
+class ImageMeta:
+    """Per-image values derived once from the user's text and reused every turn."""
+    path: str        # stripped of whitespace/quotes
+    is_url: bool
+    json_path: str
+
+_IMG_META_CACHE = {}
+_IMG_META_MAX = 256
+
+def _image_meta(image_path_or_url: str) -> ImageMeta:
+    """Return the (memoized) ImageMeta for an image path/URL."""
+    meta = _IMG_META_CACHE.get(image_path_or_url)
+    if meta is None:
+        p = _unquote(image_path_or_url)
+        meta = ImageMeta(
+            path=p,
+            is_url=p.lower().startswith(("http://", "https://")),
+            json_path=_json_path_for_image(p),
+        )
+        if len(_IMG_META_CACHE) >= _IMG_META_MAX:
+            _IMG_META_CACHE.pop(next(iter(_IMG_META_CACHE)))
+        _IMG_META_CACHE[image_path_or_url] = meta
+    return meta
+
+def _dumps_json(doc, indent=2) -> bytes:
+    """Serialize 'doc' to UTF-8 bytes (orjson when available and indent is 0/2)."""
+    if HAS_ORJSON and indent in (None, 2):
+        return orjson.dumps(doc, option=(orjson.OPT_INDENT_2 if indent else 0))
+    return json.dumps(doc, ensure_ascii=False, indent=indent).encode("utf-8")
+
+def _jsonl_paths(json_path: str) -> tuple[str, str]:
+    """Return the (<name>.header.json, <name>.jsonl) sidecars used by --json-mode=jsonl."""
+    name, _ = os.path.splitext(json_path)
+    return f"{name}.header.json", f"{name}.jsonl"
+
+def compact_json(json_path: str) -> dict:
+    """
+    Rebuild the canonical {image_path, model, api, entries:[...]} document
+    from the JSONL sidecars written in --json-mode=jsonl.
+    """
+    header_path, lines_path = _jsonl_paths(json_path)
+    doc = {}
+    if os.path.exists(header_path):
+        with open(header_path, "rb") as f:
+            doc = json.loads(f.read())
+    entries = []
+    if os.path.exists(lines_path):
+        with open(lines_path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(orjson.loads(line) if HAS_ORJSON else json.loads(line))
+    doc["entries"] = entries
+    return doc
+
 
 # ---------------------------
 # Arguments
@@ -111,11 +231,16 @@ parser.add_argument("--enable-tools", action="store_true", help="allow tool/func
 parser.add_argument("--disable-automatic-generation", action="store_false", dest="automatic_generation", help="wait for 'generate' command")
 parser.add_argument("--disable-streaming", action="store_true", help="disable token streaming output")
 parser.add_argument("--disable-stats", action="store_true", help="suppress generation performance stats")
+parser.add_argument("--stop-text", type=str, nargs="*", default=[],
+                    help="extra stop sequences, generation ends as soon as one is produced (e.g. ']]' for a bracketed list)")
 
 # Save JSON by image toggles (local only)
 parser.add_argument("--save-json-by-image", action="store_true",
                     help="After each bot reply, append JSON bound to the last image path/URL provided in chat. JSON filename is <image_path>.json")
 parser.add_argument("--json-indent", type=int, default=2, help="Indentation for JSON (0 to minify)")
+parser.add_argument("--json-mode", type=str, default="full", choices=["full", "jsonl"],
+                    help="'full' rewrites <image>.json every turn, 'jsonl' appends one line per turn to <image>.jsonl (see compact_json())")
+parser.add_argument("--json-flush-every", type=int, default=1, help="In --json-mode=full, write <image>.json every N turns (always flushed on exit)")
 
 # HTTP server mode
 parser.add_argument("--server", action="store_true",
@@ -131,8 +256,15 @@ parser.add_argument(
 )
 
 args = parser.parse_args()
+args.notify_url = (args.notify_url or "").strip()
 
 prompts = load_prompts(args.prompt)
+
+# ANSI start/end sequences for the reply color, so streamed tokens can be written raw
+_REPLY_ON, _REPLY_OFF = colored("\0", args.reply_color).split("\0")
+
+# the colored interactive prompt, encoded once
+_PROMPT_BYTES = colored(">> PROMPT: ", args.prompt_color).encode()
 interrupt = KeyboardInterrupt()
 tool_response = None
 
@@ -153,58 +285,188 @@ model = NanoLLM.from_pretrained(
     vision_scaling=args.vision_scaling,
 )
 
+# resolved once, these never change within a session
+_MODEL_REPO = getattr(model, "repo_id", None) or getattr(model, "name", None)
+_MODEL_API = getattr(model, "api", None)
+
 # ---------------------------
 # Chat history
 # ---------------------------
 
 chat_history = ChatHistory(model, args.chat_template, args.system_prompt)
 
+# template stop tokens plus any --stop-text sequences (tokenized once, not per generate)
+_stop_tokens = list(chat_history.template.stop) + [
+    model.tokenizer(text, add_special_tokens=False, return_tensors="np").input_ids.squeeze().tolist()
+    for text in args.stop_text
+]
+
+def _reset_chat_history():
+    """
+    Clear the chat back to the system prompt.
+    When a KV cache is held, pop back to the system prompt instead of a full
+    reset() so its prefix stays in the cache and isn't re-filled next request.
+    Caches that can't pop (KVCacheHF) or are out of sync fall back to reset().
+    """
+    if chat_history.kv_cache and len(chat_history) > 1 and chat_history[0].role == "system":
+        try:
+            chat_history.pop(len(chat_history) - 1)
+            return
+        except (NotImplementedError, ValueError) as e:
+            logging.debug(f"KV cache pop failed ({e}), resetting chat history")
+    chat_history.reset()
+
 # ---------------------------
 # Append (local JSON only)
 # ---------------------------
 
+# Parsed per-image documents: json_path -> {"doc", "mtime", "pending", "indent"}
+_JSON_DOCS = {}
+
 def _append_entry_to_json(
     json_path: str,
     image_path_or_url: str,
-    model,
     prompt_text: str,
     reply_text: str,
-    indent: int = 2
+    indent: int = 2,
+    flush_every: int = 1,
 ):
     """
     Append a single {timestamp, prompt, response} record into the per-image JSON file (local only).
+    The parsed document is kept in memory and written every 'flush_every' turns (and on exit).
     NOTE: No remote forwarding from here.
     """
     record = {
-        "timestamp": int(time.time()),
+        "timestamp": time.time_ns() // 1_000_000_000,
         "prompt": prompt_text,
         "response": reply_text,
     }
 
-    doc = None
-    if os.path.exists(json_path):
-        try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                doc = json.load(f)
-        except Exception:
-            doc = None
-
-    if not isinstance(doc, dict):
-        doc = {
-            "image_path": image_path_or_url.strip().strip("'").strip('"'),
-            "model": getattr(model, "repo_id", None) or getattr(model, "name", None),
-            "api": getattr(model, "api", None),
-            "entries": []
+    entry = _JSON_DOCS.get(json_path)
+    try:
+        mtime = os.path.getmtime(json_path)  # one stat, doubles as the exists() check
+    except OSError:
+        mtime = None
+
+    # parse the file only on first touch, or if something else rewrote it since
+    if entry is None or mtime != entry["mtime"]:
+        doc = None
+        if mtime is not None:
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    doc = json.load(f)
+            except (ValueError, UnicodeDecodeError) as e:
+                # keep the unreadable file around instead of silently overwriting its history
+                os.replace(json_path, json_path + ".bak")
+                cprint(f"[warn] failed to parse {json_path} ({e}), moved it to {json_path}.bak", "yellow")
+                doc = None
+
+        if not isinstance(doc, dict):
+            doc = {
+                "image_path": _unquote(image_path_or_url),
+                "model": _MODEL_REPO,
+                "api": _MODEL_API,
+                "entries": []
+            }
+
+        doc.setdefault("entries", [])
+        pending = entry["pending"] if entry else []
+        doc["entries"].extend(pending)
+        entry = _JSON_DOCS[json_path] = {"doc": doc, "mtime": mtime, "pending": pending}
+
+    entry["doc"]["entries"].append(record)
+    entry["pending"].append(record)
+    entry["indent"] = indent
+
+    if len(entry["pending"]) >= max(1, flush_every):
+        _flush_json_doc(json_path)
+
+
+def _flush_json_doc(json_path: str):
+    """Write the in-memory document for json_path to disk if it has unsaved entries."""
+    entry = _JSON_DOCS.get(json_path)
+    if not entry or not entry["pending"]:
+        return
+
+    # serialize first, then a single write to *.tmp and an atomic replace
+    payload = _dumps_json(entry["doc"], indent=entry["indent"])
+    tmp = f"{json_path}.{os.getpid()}.{threading.get_ident()}.tmp"  # never shared with comm-manager's own *.tmp
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, json_path)
+
+    entry["mtime"] = os.path.getmtime(json_path)
+    entry["pending"] = []
+    cprint(f"[saved] {json_path}", "cyan")
+
+
+@atexit.register
+def _flush_all_json_docs():
+    """Flush any buffered per-image documents on exit (including Ctrl+C)."""
+    for json_path in list(_JSON_DOCS):
+        _flush_json_doc(json_path)
+
+
+def _append_entry_to_jsonl(
+    json_path: str,
+    image_path_or_url: str,
+    prompt_text: str,
+    reply_text: str,
+):
+    """
+    Append-only variant of _append_entry_to_json() for --json-mode=jsonl.
+    The header is written once, then each turn appends a single line.
+    """
+    header_path, lines_path = _jsonl_paths(json_path)
+
+    if not os.path.exists(header_path):
+        header = {
+            "image_path": _unquote(image_path_or_url),
+            "model": _MODEL_REPO,
+            "api": _MODEL_API,
         }
+        with open(header_path, "wb") as f:
+            f.write(_dumps_json(header))
 
-    doc.setdefault("entries", [])
-    doc["entries"].append(record)
+    record = {
+        "timestamp": time.time_ns() // 1_000_000_000,
+        "prompt": prompt_text,
+        "response": reply_text,
+    }
 
-    # Persist locally
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(doc, f, ensure_ascii=False, indent=indent)
+    with open(lines_path, "ab") as f:
+        f.write(_dumps_json(record, indent=None) + b"\n")
 
-    cprint(f"[saved] {json_path}", "cyan")
+    cprint(f"[saved] {lines_path}", "cyan")
+
+
+# ---------------------------
+# Background logger (stats tables, JSON saves)
+# ---------------------------
+
+_LOG_QUEUE = queue.Queue()
+
+def _log_worker():
+    """
+    Drain _LOG_QUEUE off the main thread:
+      ("stats", dict) prints a stats table, ("json", fn) runs the JSON save fn(),
+      ("notify", fn) posts to --notify-url (queued after the save it reports on)
+    """
+    while True:
+        kind, payload = _LOG_QUEUE.get()
+        try:
+            if kind == "stats":
+                print_table(payload)
+                print("")
+            else:
+                payload()
+        except Exception as e:
+            cprint(f"[log][warn] background {kind} failed: {e}", "yellow")
+        finally:
+            _LOG_QUEUE.task_done()
+
+threading.Thread(target=_log_worker, name="log-worker", daemon=True).start()
+atexit.register(_LOG_QUEUE.join)  # registered after the JSON flush hook, so pending saves drain first
 
 
 # ---------------------------
@@ -213,11 +475,11 @@ def _append_entry_to_json(
 
 _run_lock = threading.Lock()
 
-def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
+def process_user_prompt(user_prompt: str, *, generate: bool = True, use_cache: bool = False) -> str:
     """
     Execute one cycle:
     - Detect if prompt is an image path/URL and update last_image_path.
-    - Append user prompt.
+    - Append user prompt (use_cache=True keeps its tokens/embedding for fixed prompts).
     - Optionally embed_chat + generate with the model.
     - Append bot reply.
     - Optionally save JSON bound to last_image_path (local).
@@ -226,36 +488,46 @@ def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
     """
     global last_image_path
 
-    # Detect image path/URL
+    # Detect image path/URL (http(s) images prefetched by /describe are picked up here)
+    image = None
     if _is_image_path_or_url(user_prompt):
-        last_image_path = user_prompt.strip().strip("'").strip('"')
+        meta = _image_meta(user_prompt)
+        last_image_path = meta.path
+        if meta.is_url:
+            image = _prefetched_image(last_image_path)
 
     # Append user message into chat history
-    chat_history.append("user", user_prompt)
+    if image is not None:
+        chat_history.append("user", image=image)
+    else:
+        chat_history.append("user", user_prompt, use_cache=use_cache)
 
     # If we only want to append (no generation), exit early
     if not generate:
         return ""
 
     # Embed step
-    t0 = time.perf_counter()
+    # timing is sampled at embed, first token and end only; printed unless --disable-stats
+    _now = time.perf_counter
+    show_stats = not args.disable_stats
+    t0 = _now()
     embedding, position = chat_history.embed_chat(
         max_tokens=model.config.max_length - args.max_new_tokens,
         wrap_tokens=args.wrap_tokens,
         use_cache=model.has_embed and chat_history.kv_cache,
     )
-    t1 = time.perf_counter()
-    print(f"[TICTOK] embed_chat: {(t1 - t0)*1000:.2f} ms")
+    if show_stats:
+        print(f"[TICTOK] embed_chat: {(_now() - t0)*1000:.2f} ms")
 
     # Generate step (exception-safe)
-    gen_start = time.perf_counter()
+    gen_start = _now()
     try:
         reply = model.generate(
             embedding,
             streaming=not args.disable_streaming,
             kv_cache=chat_history.kv_cache,
             cache_position=position,
-            stop_tokens=chat_history.template.stop,
+            stop_tokens=_stop_tokens,
             max_new_tokens=args.max_new_tokens,
             min_new_tokens=args.min_new_tokens,
             do_sample=args.do_sample,
@@ -266,9 +538,10 @@ def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
     except Exception as e:
         cprint(f"[error] generate() failed: {e}", "red")
         chat_history.append("bot", f"[error] generation failed: {e}")
+        chat_history.kv_cache = None  # the new messages were embedded but never prefilled
         # notify error as text if needed
         if args.notify_url:
-            _http_post_text(args.notify_url.strip(), f"[error] generation failed: {e}", timeout=10.0)
+            _LOG_QUEUE.put(("notify", partial(_notify_comm_manager, f"[error] generation failed: {e}")))
         return f"[error] generation failed: {e}"
 
     reply_text = ""
@@ -276,20 +549,24 @@ def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
         # Non-streaming mode: reply is a single string
         reply_text = reply
         cprint(reply_text, args.reply_color)
-        gen_end = time.perf_counter()
-        print(f"[TICTOK] generate_total: {(gen_end - gen_start):.3f}s")
+        if show_stats:
+            print(f"[TICTOK] generate_total: {(_now() - gen_start):.3f}s")
     else:
         # Streaming mode: reply yields tokens
         first_token_time = None
         token_count = 0
+        reply_parts = []
         for token in reply:
-            now = time.perf_counter()
             if first_token_time is None:
-                first_token_time = now
-                print(f"[TICTOK] TTFT: {(first_token_time - gen_start)*1000:.2f} ms")
-            cprint(token, args.reply_color, end="", flush=True)
-            reply_text += token
+                first_token_time = _now()
+                if show_stats:
+                    print(f"[TICTOK] TTFT: {(first_token_time - gen_start)*1000:.2f} ms")
+                sys.stdout.write(_REPLY_ON)
+            sys.stdout.write(token)
+            reply_parts.append(token)
             token_count += 1
+            if token_count % 8 == 0:
+                sys.stdout.flush()
             if interrupt:
                 try:
                     reply.stop()
@@ -298,47 +575,70 @@ def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
                 interrupt.reset()
                 break
 
-        gen_end = time.perf_counter()
+        sys.stdout.write(_REPLY_OFF)
+        sys.stdout.flush()
+        reply_text = "".join(reply_parts)
+
+        gen_end = _now()
         total_time = gen_end - gen_start
-        if token_count > 0:
+        if show_stats and token_count > 0:
             throughput = token_count / (gen_end - (first_token_time or gen_start))
             print(f"\n[TICTOK] generate_total: {total_time:.3f}s | tokens: {token_count} | throughput: {throughput:.2f} tok/s")
 
     print("")  # newline after generation
 
     if not args.disable_stats:
-        print_table(model.stats)
-        print("")
+        _LOG_QUEUE.put(("stats", dict(model.stats)))
 
-    # Append bot reply to chat history
-    chat_history.append("bot", reply_text)
+    # Append bot reply to chat history (the streaming response also carries the kv_cache)
+    if not args.disable_streaming and reply_text == reply.text:
+        chat_history.append("bot", reply)
+    else:
+        chat_history.append("bot", reply_text)
+        chat_history.kv_cache = None  # out of sync with the text, re-fill on the next turn
 
     # ---- Local JSON persistence (optional) ----
     if args.save_json_by_image:
         if last_image_path:
-            json_path = _json_path_for_image(last_image_path)
-            _append_entry_to_json(
-                json_path=json_path,
-                image_path_or_url=last_image_path,
-                model=model,
-                prompt_text=user_prompt,
-                reply_text=reply_text,
-                indent=(None if args.json_indent == 0 else args.json_indent),
-            )
+            json_path = _image_meta(last_image_path).json_path
+            if args.json_mode == "jsonl":
+                save = partial(_append_entry_to_jsonl,
+                    json_path=json_path,
+                    image_path_or_url=last_image_path,
+                    prompt_text=user_prompt,
+                    reply_text=reply_text,
+                )
+            else:
+                save = partial(_append_entry_to_json,
+                    json_path=json_path,
+                    image_path_or_url=last_image_path,
+                    prompt_text=user_prompt,
+                    reply_text=reply_text,
+                    indent=(None if args.json_indent == 0 else args.json_indent),
+                    flush_every=args.json_flush_every,
+                )
+            _LOG_QUEUE.put(("json", save))
         else:
             cprint("[warn] --save-json-by-image is enabled, but no image path/URL was provided yet.", "red")
 
     # ---- Notify comm-manager (message-only) ----
-    if args.notify_url and reply_text.strip():
-        status, body = _http_post_text(args.notify_url.strip(), reply_text.strip(), timeout=10.0)
-        if status in (200, 201):
-            cprint(f"[notify] sent caption to {args.notify_url} (status {status})", "cyan")
-        else:
-            cprint(f"[notify][warn] failed to notify {args.notify_url} (status {status}): {body}", "yellow")
+    # queued behind the JSON save, so comm-manager never sees the caption before the sidecar
+    notify_text = reply_text.strip() if args.notify_url else ""
+    if notify_text:
+        _LOG_QUEUE.put(("notify", partial(_notify_comm_manager, notify_text)))
 
     return reply_text
 
 
+def _notify_comm_manager(text: str):
+    """POST a reply to --notify-url (runs on the log worker, after the JSON save)."""
+    status, body = _http_post_text(args.notify_url, text, timeout=10.0)
+    if status in (200, 201):
+        cprint(f"[notify] sent caption to {args.notify_url} (status {status})", "cyan")
+    else:
+        cprint(f"[notify][warn] failed to notify {args.notify_url} (status {status}): {body}", "yellow")
+
+
 # ---------------------------
 # HTTP Server mode (Flask)
 # ---------------------------
@@ -347,6 +647,9 @@ if args.server:
     # Lazy import so Flask is only required in --server mode.
     from flask import Flask, request, jsonify
 
+    # fixed per-image prompt, its templated embedding is cached after the first request
+    AUTO_PROMPT = "Describe the objects in the image"
+
     app = Flask(__name__)
 
     @app.route("/describe", methods=["POST"])
@@ -373,23 +676,30 @@ if args.server:
         if not image_path:
             return jsonify({"error": "image_path is required"}), 400
 
+        # start fetching URL images while waiting on the lock / resetting the chat
+        if image_path.lower().startswith(("http://", "https://")):
+            _prefetch_image_url(_unquote(image_path))
+
         with _run_lock:
-            # RESET between requests
-            chat_history.reset()
+            # RESET between requests (keeps the system prompt KV prefix when cached)
+            _reset_chat_history()
             globals()['last_image_path'] = None
 
             # 1) add the image to history (no generation)
             process_user_prompt(image_path, generate=False)
 
             # 2) auto prompt
-            auto_prompt = "Describe the objects in the image"
-            resp_describe = process_user_prompt(auto_prompt, generate=True)
+            auto_prompt = AUTO_PROMPT
+            resp_describe = process_user_prompt(auto_prompt, generate=True, use_cache=True)
 
             # 3) optional follow-up
             resp_question = None
             if question:
                 resp_question = process_user_prompt(question, generate=True)
 
+            # the sidecar is written (and comm-manager notified) before we answer
+            _LOG_QUEUE.join()
+
         return jsonify({
             "ok": True,
             "image_path": image_path,
@@ -414,6 +724,8 @@ if args.server:
 
 while True:
     if chat_history.turn("user"):
+        _LOG_QUEUE.join()  # finish the last stats table / save before prompting
+
         # Fetch next prompt
         if isinstance(prompts, list):
             if len(prompts) > 0:
@@ -422,7 +734,9 @@ while True:
             else:
                 break
         else:
-            cprint(">> PROMPT: ", args.prompt_color, end="", flush=True)
+            sys.stdout.flush()
+            sys.stdout.buffer.write(_PROMPT_BYTES)
+            sys.stdout.buffer.flush()
             user_prompt = sys.stdin.readline().strip()
 
         print("")
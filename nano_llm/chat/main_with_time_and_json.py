@@ -1,42 +1,51 @@
 #!/usr/bin/env python3
 import os
+import re
 import sys
 import time
-import signal
+import atexit
 import logging
+import queue
+import threading
 import json
-from urllib.parse import urlparse
-from termcolor import cprint
+from dataclasses import dataclass
+from functools import partial
+from termcolor import cprint, colored
 
-import numpy as np
+try:
+    import orjson
+    HAS_ORJSON=True
+except ImportError:
+    HAS_ORJSON=False
 
 from nano_llm import NanoLLM, ChatHistory, ChatTemplates, BotFunctions
 from nano_llm.utils import ImageExtensions, ArgParser, KeyboardInterrupt, load_prompts, print_table 
 
 # =============== New helpers for JSON saving ===============
 
-def _ext_of(path: str) -> str:
-    """Return the lowercase extension (with leading '.') of a path/URL."""
-    p = path.strip().strip("'").strip('"')
-    if p.lower().startswith(("http://", "https://")):
-        parsed = urlparse(p)
-        _, ext = os.path.splitext(parsed.path)
-        return ext.lower()
-    _, ext = os.path.splitext(p)
-    return ext.lower()
+# ImageExtensions may be like [".jpg", ".png", ...] or ["jpg","png",...] - normalize once at import
+_IMG_EXTS = frozenset(
+    (e if e.startswith(".") else f".{e}").lower()
+    for e in (ImageExtensions if isinstance(ImageExtensions, (list, set, tuple)) else [])
+) or frozenset({".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff", ".tif", ".gif"})
+
+# Image path/URL detection in one pass: optional quotes, a local path or http(s) URL
+# (with optional query/fragment) ending in one of the _IMG_EXTS extensions.
+_IMG_EXT_RE = "|".join(re.escape(e) for e in sorted(_IMG_EXTS, key=len, reverse=True))
+_IMG_RE = re.compile(
+    rf"""^\s*['"]*(?:https?://[^?#]+?(?:{_IMG_EXT_RE})(?:[?#].*)?|(?!https?://).+?(?:{_IMG_EXT_RE}))['"]*\s*$""",
+    re.IGNORECASE,
+)
+
+_QUOTES = "'\""
+
+def _unquote(text: str) -> str:
+    """Strip surrounding whitespace and quotes from a pasted path/URL."""
+    return text.strip().strip(_QUOTES)
 
 def _is_image_path_or_url(user_text: str) -> bool:
     """Detect if the input looks like an image path/URL by its extension."""
-    if not user_text:
-        return False
-    ext = _ext_of(user_text)
-    # ImageExtensions may be like [".jpg", ".png", ...] or ["jpg","png",...]
-    # Normalize both cases:
-    normalized = {e if e.startswith(".") else f".{e}" for e in (ImageExtensions if isinstance(ImageExtensions, (list, set, tuple)) else [])}
-    if not normalized:
-        # fallback if ImageExtensions is not iterable/available
-        normalized = {".jpg",".jpeg",".png",".webp",".bmp",".tiff",".tif",".gif"}
-    return ext in normalized
+    return bool(user_text) and _IMG_RE.match(user_text) is not None
 
 def _json_path_for_image(image_path_or_url: str) -> str:
     """
@@ -44,8 +53,9 @@ def _json_path_for_image(image_path_or_url: str) -> str:
       - Local file: replace extension with .json (same directory)
       - URL: use URL basename (without query) and put <basename>.json in CWD
     """
-    p = image_path_or_url.strip().strip("'").strip('"')
+    p = _unquote(image_path_or_url)
     if p.lower().startswith(("http://", "https://")):
+        from urllib.parse import urlparse  # only needed for URL images
         parsed = urlparse(p)
         base = os.path.basename(parsed.path) or "image"
         name, _ = os.path.splitext(base)
@@ -54,9 +64,73 @@ def _json_path_for_image(image_path_or_url: str) -> str:
     name, _ = os.path.splitext(p)
     return f"{name}.json"
 
-def _append_entry_to_json(json_path: str, image_path_or_url: str, model, prompt_text: str, reply_text: str, indent: int = 2):
+@dataclass
+class ImageMeta:
+    """Per-image values derived once from the user's text and reused every turn."""
+    path: str        # stripped of whitespace/quotes
+    is_url: bool
+    json_path: str
+
+_IMG_META_CACHE = {}
+_IMG_META_MAX = 256
+
+def _image_meta(image_path_or_url: str) -> ImageMeta:
+    """Return the (memoized) ImageMeta for an image path/URL."""
+    meta = _IMG_META_CACHE.get(image_path_or_url)
+    if meta is None:
+        p = _unquote(image_path_or_url)
+        meta = ImageMeta(
+            path=p,
+            is_url=p.lower().startswith(("http://", "https://")),
+            json_path=_json_path_for_image(p),
+        )
+        if len(_IMG_META_CACHE) >= _IMG_META_MAX:
+            _IMG_META_CACHE.pop(next(iter(_IMG_META_CACHE)))
+        _IMG_META_CACHE[image_path_or_url] = meta
+    return meta
+
+def _dumps_json(doc, indent=2) -> bytes:
+    """Serialize 'doc' to UTF-8 bytes (orjson when available and indent is 0/2)."""
+    if HAS_ORJSON and indent in (None, 2):
+        return orjson.dumps(doc, option=(orjson.OPT_INDENT_2 if indent else 0))
+    return json.dumps(doc, ensure_ascii=False, indent=indent).encode("utf-8")
+
+def _jsonl_paths(json_path: str) -> tuple[str, str]:
+    """Return the (<name>.header.json, <name>.jsonl) sidecars used by --json-mode=jsonl."""
+    name, _ = os.path.splitext(json_path)
+    return f"{name}.header.json", f"{name}.jsonl"
+
+def compact_json(json_path: str) -> dict:
     """
-    Create/append an entry {timestamp, prompt, response} into a JSON file:
+    Rebuild the canonical document from the JSONL sidecars:
+    {
+      "image_path": ...,
+      "model": ...,
+      "api": ...,
+      "entries": [ {timestamp, prompt, response}, ... ]
+    }
+    """
+    header_path, lines_path = _jsonl_paths(json_path)
+    doc = {}
+    if os.path.exists(header_path):
+        with open(header_path, "rb") as f:
+            doc = json.loads(f.read())
+    entries = []
+    if os.path.exists(lines_path):
+        with open(lines_path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(orjson.loads(line) if HAS_ORJSON else json.loads(line))
+    doc["entries"] = entries
+    return doc
+
+# Parsed per-image documents: json_path -> {"doc", "mtime", "pending", "indent"}
+_JSON_DOCS = {}
+
+def _append_entry_to_json(json_path: str, image_path_or_url: str, prompt_text: str, reply_text: str, indent: int = 2, flush_every: int = 1):
+    """
+    Create/append an entry {timestamp, prompt, response} into a JSON file.
+    The parsed document is kept in memory and written every 'flush_every' turns (and on exit):
     {
       "image_path": ...,
       "model": ...,
@@ -65,35 +139,129 @@ def _append_entry_to_json(json_path: str, image_path_or_url: str, model, prompt_
     }
     """
     record = {
-        "timestamp": int(time.time()),
+        "timestamp": time.time_ns() // 1_000_000_000,
         "prompt": prompt_text,
         "response": reply_text,
     }
 
-    # load existing
-    doc = None
-    if os.path.exists(json_path):
-        try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                doc = json.load(f)
-        except Exception:
-            doc = None
-
-    if not isinstance(doc, dict):
-        doc = {
-            "image_path": image_path_or_url.strip().strip("'").strip('"'),
-            "model": getattr(model, "repo_id", None) or getattr(model, "name", None),
-            "api": getattr(model, "api", None),
-            "entries": []
+    entry = _JSON_DOCS.get(json_path)
+    try:
+        mtime = os.path.getmtime(json_path)  # one stat, doubles as the exists() check
+    except OSError:
+        mtime = None
+
+    # parse the file only on first touch, or if something else rewrote it since
+    if entry is None or mtime != entry["mtime"]:
+        doc = None
+        if mtime is not None:
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    doc = json.load(f)
+            except (ValueError, UnicodeDecodeError) as e:
+                # keep the unreadable file around instead of silently overwriting its history
+                os.replace(json_path, json_path + ".bak")
+                cprint(f"[warn] failed to parse {json_path} ({e}), moved it to {json_path}.bak", "yellow")
+                doc = None
+
+        if not isinstance(doc, dict):
+            doc = {
+                "image_path": _unquote(image_path_or_url),
+                "model": _MODEL_REPO,
+                "api": _MODEL_API,
+                "entries": []
+            }
+
+        doc.setdefault("entries", [])
+        pending = entry["pending"] if entry else []
+        doc["entries"].extend(pending)
+        entry = _JSON_DOCS[json_path] = {"doc": doc, "mtime": mtime, "pending": pending}
+
+    entry["doc"]["entries"].append(record)
+    entry["pending"].append(record)
+    entry["indent"] = indent
+
+    if len(entry["pending"]) >= max(1, flush_every):
+        _flush_json_doc(json_path)
+
+
+def _flush_json_doc(json_path: str):
+    """Write the in-memory document for json_path to disk if it has unsaved entries."""
+    entry = _JSON_DOCS.get(json_path)
+    if not entry or not entry["pending"]:
+        return
+
+    # serialize first, then a single write to *.tmp and an atomic replace
+    payload = _dumps_json(entry["doc"], indent=entry["indent"])
+    tmp = f"{json_path}.{os.getpid()}.{threading.get_ident()}.tmp"  # never shared with comm-manager's own *.tmp
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, json_path)
+
+    entry["mtime"] = os.path.getmtime(json_path)
+    entry["pending"] = []
+    cprint(f"[saved] {json_path}", "cyan")
+
+
+@atexit.register
+def _flush_all_json_docs():
+    """Flush any buffered per-image documents on exit (including Ctrl+C)."""
+    for json_path in list(_JSON_DOCS):
+        _flush_json_doc(json_path)
+
+def _append_entry_to_jsonl(json_path: str, image_path_or_url: str, prompt_text: str, reply_text: str):
+    """
+    Append-only variant of _append_entry_to_json() for --json-mode=jsonl:
+      - <name>.header.json holds {image_path, model, api} and is written once
+      - <name>.jsonl gets one {timestamp, prompt, response} line per turn
+    Use compact_json() to get the combined document back.
+    """
+    header_path, lines_path = _jsonl_paths(json_path)
+
+    if not os.path.exists(header_path):
+        header = {
+            "image_path": _unquote(image_path_or_url),
+            "model": _MODEL_REPO,
+            "api": _MODEL_API,
         }
+        with open(header_path, "wb") as f:
+            f.write(_dumps_json(header))
 
-    doc.setdefault("entries", [])
-    doc["entries"].append(record)
+    record = {
+        "timestamp": time.time_ns() // 1_000_000_000,
+        "prompt": prompt_text,
+        "response": reply_text,
+    }
 
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(doc, f, ensure_ascii=False, indent=indent)
+    with open(lines_path, "ab") as f:
+        f.write(_dumps_json(record, indent=None) + b"\n")
 
-    cprint(f"[saved] {json_path}", "cyan")
+    cprint(f"[saved] {lines_path}", "cyan")
+
+
+# =============== Background logger (stats tables, JSON saves) ===============
+
+_LOG_QUEUE = queue.Queue()
+
+def _log_worker():
+    """
+    Drain _LOG_QUEUE off the main thread:
+      ("stats", dict) prints a stats table, ("json", fn) runs the JSON save fn()
+    """
+    while True:
+        kind, payload = _LOG_QUEUE.get()
+        try:
+            if kind == "stats":
+                print_table(payload)
+                print("")
+            else:
+                payload()
+        except Exception as e:
+            cprint(f"[log][warn] background {kind} failed: {e}", "yellow")
+        finally:
+            _LOG_QUEUE.task_done()
+
+threading.Thread(target=_log_worker, name="log-worker", daemon=True).start()
+atexit.register(_LOG_QUEUE.join)  # registered after the JSON flush hook, so pending saves drain first
 
 
 # =============== Args ===============
@@ -113,10 +281,19 @@ parser.add_argument("--disable-stats", action="store_true", help="suppress the p
 parser.add_argument("--save-json-by-image", action="store_true",
                     help="After each bot reply, save/append JSON bound to the last image path/URL provided in chat. The JSON filename is <image_path>.json")
 parser.add_argument("--json-indent", type=int, default=2, help="Indentation for JSON output (0 to minify)")
+parser.add_argument("--json-mode", type=str, default="full", choices=["full", "jsonl"],
+                    help="'full' rewrites <image>.json every turn, 'jsonl' appends one line per turn to <image>.jsonl")
+parser.add_argument("--json-flush-every", type=int, default=1, help="In --json-mode=full, write <image>.json every N turns (always flushed on exit)")
 
 args = parser.parse_args()
 
 prompts = load_prompts(args.prompt)
+
+# ANSI start/end sequences for the reply color, so streamed tokens can be written raw
+_REPLY_ON, _REPLY_OFF = colored("\0", args.reply_color).split("\0")
+
+# the colored interactive prompt, encoded once
+_PROMPT_BYTES = colored(">> PROMPT: ", args.prompt_color).encode()
 interrupt = KeyboardInterrupt()
 tool_response = None
 
@@ -135,6 +312,10 @@ model = NanoLLM.from_pretrained(
     vision_scaling=args.vision_scaling, 
 )
 
+# resolved once, these never change within a session
+_MODEL_REPO = getattr(model, "repo_id", None) or getattr(model, "name", None)
+_MODEL_API = getattr(model, "api", None)
+
 # =============== Chat History ===============
 
 chat_history = ChatHistory(model, args.chat_template, args.system_prompt)
@@ -143,6 +324,8 @@ chat_history = ChatHistory(model, args.chat_template, args.system_prompt)
 
 while True: 
     if chat_history.turn('user'):
+        _LOG_QUEUE.join()  # finish the last stats table / save before prompting
+
         # when it's the user's turn to prompt, get the next input
         if isinstance(prompts, list):
             if len(prompts) > 0:
@@ -151,7 +334,9 @@ while True:
             else:
                 break
         else:
-            cprint('>> PROMPT: ', args.prompt_color, end='', flush=True)
+            sys.stdout.flush()
+            sys.stdout.buffer.write(_PROMPT_BYTES)
+            sys.stdout.buffer.flush()
             user_prompt = sys.stdin.readline().strip()
 
         print('')
@@ -168,7 +353,7 @@ while True:
 
         # Detect if the user just supplied an image path/URL
         if _is_image_path_or_url(user_prompt):
-            last_image_path = user_prompt.strip().strip("'").strip('"')
+            last_image_path = _image_meta(user_prompt).path
 
         # add user prompt and embed
         chat_history.append('user', user_prompt)
@@ -176,19 +361,22 @@ while True:
     # ----------------------------
     # TICTOK:  embed_chat
     # ----------------------------
-    t0 = time.perf_counter()
+    # timing is sampled at embed, first token and end only; printed unless --disable-stats
+    _now = time.perf_counter
+    show_stats = not args.disable_stats
+    t0 = _now()
     embedding, position = chat_history.embed_chat(
         max_tokens=model.config.max_length - args.max_new_tokens,
         wrap_tokens=args.wrap_tokens,
         use_cache=model.has_embed and chat_history.kv_cache,
     )
-    t1 = time.perf_counter()
-    print(f"[TICTOK] embed_chat: {(t1 - t0)*1000:.2f} ms")
+    if show_stats:
+        print(f"[TICTOK] embed_chat: {(_now() - t0)*1000:.2f} ms")
 
     # ----------------------------
     # TICTOK: generate
     # ----------------------------
-    gen_start = time.perf_counter()
+    gen_start = _now()
     reply = model.generate(
         embedding, 
         streaming=not args.disable_streaming, 
@@ -209,19 +397,23 @@ while True:
         # non-streaming returns full string
         reply_text = reply
         cprint(reply_text, args.reply_color)
-        gen_end = time.perf_counter()
-        print(f"[TICTOK] generate_total: {(gen_end - gen_start):.3f}s")
+        if show_stats:
+            print(f"[TICTOK] generate_total: {(_now() - gen_start):.3f}s")
     else:
         first_token_time = None
         token_count = 0
+        reply_parts = []  # collect for JSON/logging, joined once at the end
         for token in reply:
-            now = time.perf_counter()
             if first_token_time is None:
-                first_token_time = now
-                print(f"[TICTOK] TTFT: {(first_token_time - gen_start)*1000:.2f} ms")
-            cprint(token, args.reply_color, end='', flush=True)
-            reply_text += token  # collect for JSON/logging
+                first_token_time = _now()
+                if show_stats:
+                    print(f"[TICTOK] TTFT: {(first_token_time - gen_start)*1000:.2f} ms")
+                sys.stdout.write(_REPLY_ON)
+            sys.stdout.write(token)
+            reply_parts.append(token)
             token_count += 1
+            if token_count % 8 == 0:
+                sys.stdout.flush()
             if interrupt:
                 # reply is a generator-like object with .stop()
                 try:
@@ -230,17 +422,19 @@ while True:
                     pass
                 interrupt.reset()
                 break
-        gen_end = time.perf_counter()
+        sys.stdout.write(_REPLY_OFF)
+        sys.stdout.flush()
+        reply_text = ''.join(reply_parts)
+        gen_end = _now()
         total_time = gen_end - gen_start
-        if token_count > 0:
+        if show_stats and token_count > 0:
             throughput = token_count / (gen_end - (first_token_time or gen_start))
             print(f"\n[TICTOK] generate_total: {total_time:.3f}s | tokens: {token_count} | throughput: {throughput:.2f} tok/s")
 
     print('\n')
     
     if not args.disable_stats:
-        print_table(model.stats)
-        print('')
+        _LOG_QUEUE.put(("stats", dict(model.stats)))
     
     # save the output and kv cache
     chat_history.append('bot', reply_text)
@@ -248,15 +442,24 @@ while True:
     # After each answer: save/append JSON bound to the last image seen
     if args.save_json_by_image:
         if last_image_path:
-            json_path = _json_path_for_image(last_image_path)
-            _append_entry_to_json(
-                json_path=json_path,
-                image_path_or_url=last_image_path,
-                model=model,
-                prompt_text=user_prompt,
-                reply_text=reply_text,
-                indent=(None if args.json_indent == 0 else args.json_indent),
-            )
+            json_path = _image_meta(last_image_path).json_path
+            if args.json_mode == "jsonl":
+                save = partial(_append_entry_to_jsonl,
+                    json_path=json_path,
+                    image_path_or_url=last_image_path,
+                    prompt_text=user_prompt,
+                    reply_text=reply_text,
+                )
+            else:
+                save = partial(_append_entry_to_json,
+                    json_path=json_path,
+                    image_path_or_url=last_image_path,
+                    prompt_text=user_prompt,
+                    reply_text=reply_text,
+                    indent=(None if args.json_indent == 0 else args.json_indent),
+                    flush_every=args.json_flush_every,
+                )
+            _LOG_QUEUE.put(("json", save))
         else:
             cprint("[warn] --save-json-by-image is enabled, but no image path/URL has been provided yet in this session.", "red")
 
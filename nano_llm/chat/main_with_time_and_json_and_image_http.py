@@ -14,18 +14,29 @@ Additions:
 """
 
 import os
+import re
 import sys
 import time
 import json
 import signal
+import atexit
 import logging
 import threading
 
-import base64
-import urllib.request, urllib.error
+import hashlib
+import functools
+from collections import OrderedDict
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
-from termcolor import cprint
+from termcolor import cprint, colored
+
+try:
+    import orjson
+    HAS_ORJSON=True
+except ImportError:
+    HAS_ORJSON=False
 import numpy as np
 
 # NanoLLM stack (assumes your existing environment)
@@ -33,69 +44,298 @@ from nano_llm import NanoLLM, ChatHistory, ChatTemplates, BotFunctions
 from nano_llm.utils import ImageExtensions, ArgParser, KeyboardInterrupt, load_prompts, print_table
 
 # ---------------------------
-# Lightweight HTTP client (stdlib)
+# Lightweight HTTP client (stdlib, keep-alive)
 # ---------------------------
-import urllib.request
-import urllib.error
-
-def _http_post_json(url: str, payload: dict, timeout: float = 6.0) -> tuple[int, str]:
+import uuid
+import http.client
+from urllib.parse import urlsplit, urljoin
+
+# per-thread persistent connections keyed by (scheme, netloc), reset after fork
+_HTTP_LOCAL = threading.local()
+
+def _http_conn(scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+    """Return this thread's open connection to scheme://netloc, creating it if needed."""
+    if getattr(_HTTP_LOCAL, "pid", None) != os.getpid():
+        _HTTP_LOCAL.pid = os.getpid()
+        _HTTP_LOCAL.conns = {}
+    conn = _HTTP_LOCAL.conns.get((scheme, netloc))
+    if conn is None:
+        conn_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = _HTTP_LOCAL.conns[(scheme, netloc)] = conn_class(netloc, timeout=timeout)
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+def _http_drop_conn(scheme: str, netloc: str):
+    conn = _HTTP_LOCAL.conns.pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+@functools.lru_cache(maxsize=16)
+def _split_url(url: str) -> tuple[str, str, str]:
+    """Split 'url' once into (scheme, netloc, path?query) for http.client."""
+    parts = urlsplit(url)
+    return parts.scheme, parts.netloc, (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+def _http_post(url: str, body, content_type: str, timeout: float = 6.0) -> tuple[int, str]:
     """
-    POST 'payload' as JSON to 'url' using Python stdlib (no 'requests' dependency).
-    Returns: (status_code, response_text) or raises on malformed URL.
+    POST 'body' to 'url' using Python stdlib (no 'requests' dependency).
+    'body' is bytes or a list of parts, each either bytes or a (local_path, size)
+    tuple that is streamed from disk with socket.sendfile() (zero-copy on plain HTTP).
+    The TCP connection is kept alive and reused between calls to the same host.
+    Returns: (status_code, response_text) or (-1, err) on network errors.
     """
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url=url,
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            status = getattr(resp, "status", 200)
+    scheme, netloc, path = _split_url(url)
+    parts = [body] if isinstance(body, (bytes, bytearray)) else body
+    length = sum(p[1] if isinstance(p, tuple) else len(p) for p in parts)
+
+    for attempt in range(2):
+        conn = _http_conn(scheme, netloc, timeout)
+        try:
+            conn.putrequest("POST", path)
+            conn.putheader("Content-Type", content_type)
+            conn.putheader("Content-Length", str(length))
+            conn.endheaders()
+            for part in parts:
+                if isinstance(part, tuple):
+                    with open(part[0], "rb") as f:
+                        conn.sock.sendfile(f, 0, part[1])
+                else:
+                    conn.send(part)
+            resp = conn.getresponse()
             body = resp.read().decode("utf-8", errors="replace")
-            return status, body
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8", errors="replace") if e.fp else str(e)
-        return e.code, body
-    except Exception as e:
-        # Network/timeout/DNS errors end up here; caller will log a warning.
-        return -1, str(e)
+            if resp.will_close:
+                _http_drop_conn(scheme, netloc)
+            return resp.status, body
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+            # the server closed an idle keep-alive connection, reconnect once
+            _http_drop_conn(scheme, netloc)
+            if attempt > 0:
+                return -1, str(e)
+        except Exception as e:
+            # Network/timeout/DNS errors end up here; caller will log a warning.
+            _http_drop_conn(scheme, netloc)
+            return -1, str(e)
+
+def _http_get(url: str, max_bytes: int, timeout: float = 6.0, redirects: int = 3) -> bytes:
+    """
+    GET 'url' over the same keep-alive connections, following up to 'redirects' redirects.
+    Raises on network errors, non-200 answers, or bodies larger than 'max_bytes'.
+    """
+    scheme, netloc, path = _split_url(url)
+    for attempt in range(2):
+        conn = _http_conn(scheme, netloc, timeout)
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            data = resp.read(max_bytes + 1)
+            if len(data) > max_bytes:
+                raise ValueError(f"image too large (> {max_bytes} bytes)")
+            resp.read()  # drain so the connection can be reused
+            if resp.will_close:
+                _http_drop_conn(scheme, netloc)
+            break
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            _http_drop_conn(scheme, netloc)
+            if attempt > 0:
+                raise
+        except Exception:
+            _http_drop_conn(scheme, netloc)
+            raise
+    if resp.status in (301, 302, 303, 307, 308) and redirects > 0 and resp.getheader("Location"):
+        return _http_get(urljoin(url, resp.getheader("Location")), max_bytes, timeout, redirects - 1)
+    if resp.status != 200:
+        raise ValueError(f"GET {url} returned HTTP {resp.status}")
+    return data
+
+def _http_post_multipart(url: str, fields: dict, files: dict, timeout: float = 6.0) -> tuple[int, str]:
+    """
+    POST multipart/form-data to 'url'.
+      fields: {name: bytes}                      -> plain form fields
+      files:  {name: (filename, bytes)}          -> binary file parts, sent as-is
+              {name: (filename, (path, size))}   -> streamed from disk
+    Small pieces are coalesced; large values are sent without being copied.
+    Returns (status_code, response_text).
+    """
+    boundary = uuid.uuid4().hex
+    parts, buf = [], bytearray()
+
+    def emit(chunk):
+        nonlocal buf
+        if isinstance(chunk, tuple) or len(chunk) > 65536:
+            if buf:
+                parts.append(bytes(buf))
+                buf = bytearray()
+            parts.append(chunk)
+        else:
+            buf += chunk
+
+    for name, value in fields.items():
+        emit(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode())
+        emit(value)
+        emit(b"\r\n")
+    for name, (filename, value) in files.items():
+        filename = filename.replace('"', "%22")
+        emit(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+             f'Content-Type: application/octet-stream\r\n\r\n'.encode())
+        emit(value)
+        emit(b"\r\n")
+    emit(f"--{boundary}--\r\n".encode())
+    parts.append(bytes(buf))
+    return _http_post(url, parts, f"multipart/form-data; boundary={boundary}", timeout=timeout)
 
 
 # ---------------------------
 # Helpers for JSON by image
 # ---------------------------
 
+def _dumps_json(doc, indent=2) -> bytes:
+    """Serialize 'doc' to UTF-8 bytes (orjson when available and indent is 0/2)."""
+    if HAS_ORJSON and indent in (None, 2):
+        return orjson.dumps(doc, option=(orjson.OPT_INDENT_2 if indent else 0))
+    return json.dumps(doc, ensure_ascii=False, indent=indent).encode("utf-8")
 
-def _read_image_bytes(path_or_url: str, max_bytes: int = 25*1024*1024):
+def _loads_json(data):
+    """Parse JSON text/bytes (orjson when available)."""
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+def _jsonl_paths(json_path: str) -> tuple[str, str]:
+    """Return the (<name>.header.json, <name>.jsonl) sidecars used by --json-mode=jsonl."""
+    name, _ = os.path.splitext(json_path)
+    return f"{name}.header.json", f"{name}.jsonl"
+
+def compact_json(json_path: str) -> dict:
     """
-    Read image bytes from a local path or URL.
-    Returns (data_bytes, base_name, ext) or (b"", "image", ".jpg") on failure.
+    Rebuild the canonical {image_path, model, api, entries:[...]} document
+    from the JSONL sidecars written in --json-mode=jsonl.
     """
-    p = (path_or_url or "").strip().strip("'").strip('"')
+    header_path, lines_path = _jsonl_paths(json_path)
+    doc = {}
+    if os.path.exists(header_path):
+        with open(header_path, "rb") as f:
+            doc = _loads_json(f.read())
+    entries = []
+    if os.path.exists(lines_path):
+        with open(lines_path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(_loads_json(line))
+    doc["entries"] = entries
+    return doc
+
+# ImageExtensions may be like [".jpg", ".png", ...] or ["jpg","png",...] - normalize once at import
+_IMG_EXTS = frozenset(
+    (e if e.startswith(".") else f".{e}").lower()
+    for e in (ImageExtensions if isinstance(ImageExtensions, (list, set, tuple)) else [])
+) or frozenset({".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff", ".tif", ".gif"})
+
+# Image path/URL detection in one pass: optional quotes, a local path or http(s) URL
+# (with optional query/fragment) ending in one of the _IMG_EXTS extensions.
+_IMG_EXT_RE = "|".join(re.escape(e) for e in sorted(_IMG_EXTS, key=len, reverse=True))
+_IMG_RE = re.compile(
+    rf"""^\s*['"]*(?:https?://[^?#]+?(?:{_IMG_EXT_RE})(?:[?#].*)?|(?!https?://).+?(?:{_IMG_EXT_RE}))['"]*\s*$""",
+    re.IGNORECASE,
+)
+
+_QUOTES = "'\""
+
+def _unquote(text: str) -> str:
+    """Strip surrounding whitespace and quotes from a pasted path/URL."""
+    return text.strip().strip(_QUOTES)
+
+_MAX_IMAGE_BYTES = 25*1024*1024
+
+_URL_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="url-prefetch")
+_URL_CACHE = {}       # url -> (expires, Future[(bytes, sha256_hex)])
+_URL_CACHE_MAX = 8
+_URL_CACHE_TTL = 30.0         # long enough for the model and the forwarder to share one download
+_URL_LOCK = threading.Lock()  # the cache is shared with the forward workers
+
+def _download_image(url: str, max_bytes: int = _MAX_IMAGE_BYTES):
+    data = _http_get(url, max_bytes, timeout=6.0)
+    return data, hashlib.sha256(data).hexdigest()
+
+def _prefetch_image_url(url: str):
+    """Start downloading an http(s) image in the background (no-op if already cached/in-flight)."""
+    now = time.monotonic()
+    with _URL_LOCK:
+        for key in [k for k, (expires, _) in _URL_CACHE.items() if expires <= now]:
+            del _URL_CACHE[key]
+        entry = _URL_CACHE.get(url)
+        if entry is None:
+            if len(_URL_CACHE) >= _URL_CACHE_MAX:
+                _URL_CACHE.pop(next(iter(_URL_CACHE)))
+            entry = _URL_CACHE[url] = (now + _URL_CACHE_TTL, _URL_POOL.submit(_download_image, url))
+        return entry[1]
+
+def _read_image_url(url: str):
+    """
+    Return (data_bytes, sha256_hex) for an image URL, downloading it once and
+    sharing the result between the model and the forwarder. Raises on failure.
+    """
+    future = _prefetch_image_url(url)
     try:
-        if p.lower().startswith(("http://", "https://")):
-            with urllib.request.urlopen(p, timeout=6.0) as resp:
-                data = resp.read(max_bytes + 1)
-            parsed = urlparse(p)
-            base = os.path.splitext(os.path.basename(parsed.path) or "image")[0]
-        else:
-            with open(p, "rb") as f:
-                data = f.read(max_bytes + 1)
-            base = os.path.splitext(os.path.basename(p) or "image")[0]
-        if len(data) > max_bytes:
-            raise ValueError(f"image too large (> {max_bytes} bytes)")
-        ext = _ext_of(p) or ".jpg"
-        return data, base, ext
+        return future.result()
     except Exception:
-        return b"", "image", ".jpg"
+        with _URL_LOCK:
+            entry = _URL_CACHE.get(url)
+            if entry is not None and entry[1] is future:
+                del _URL_CACHE[url]  # let the next turn retry
+        raise
 
+def _prefetched_image(url: str):
+    """
+    Return the image at 'url' as a PIL image, or None if the download failed
+    (the vision loader then fetches it itself).
+    """
+    try:
+        from PIL import Image
+        image = Image.open(BytesIO(_read_image_url(url)[0]))
+        image.load()
+        return image
+    except Exception as e:
+        cprint(f"[prefetch][warn] failed to prefetch {url}: {e}", "yellow")
+        return None
+
+@functools.lru_cache(maxsize=256)
+def _local_image_digest(path: str, mtime_ns: int, size: int) -> str:
+    """sha256 a local image once per (path, mtime_ns, size), hashing it in 1 MB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _load_image(p: str):
+    """
+    Resolve the image to forward; 'p' is an already-unquoted path/URL.
+    Returns (source, base_name, ext, sha256_hex) or (None, "image", ".jpg", None) on failure,
+    where source is the fetched bytes for URLs and (path, size) for local files,
+    which are streamed from disk rather than read into memory.
+    """
+    if p.lower().startswith(("http://", "https://")):
+        try:
+            img_bytes, digest = _read_image_url(p)
+        except Exception:
+            return None, "image", ".jpg", None
+        base = os.path.splitext(os.path.basename(urlparse(p).path) or "image")[0]
+        return img_bytes, base, (_ext_of(p) or ".jpg"), digest
+    try:
+        st = os.stat(p)
+        if not 0 < st.st_size <= _MAX_IMAGE_BYTES:
+            return None, "image", ".jpg", None
+        digest = _local_image_digest(p, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None, "image", ".jpg", None
+    base = os.path.splitext(os.path.basename(p) or "image")[0]
+    return (p, st.st_size), base, (_ext_of(p) or ".jpg"), digest
 
 
+@functools.lru_cache(maxsize=256)
 def _ext_of(path: str) -> str:
     """Return the lowercase extension of a local path or URL."""
-    p = path.strip().strip("'").strip('"')
+    p = _unquote(path)
     if p.lower().startswith(("http://", "https://")):
         parsed = urlparse(p)
         _, ext = os.path.splitext(parsed.path)
@@ -105,18 +345,12 @@ def _ext_of(path: str) -> str:
 
 def _is_image_path_or_url(user_text: str) -> bool:
     """Detect if the user_text looks like an image path or image URL."""
-    if not user_text:
-        return False
-    ext = _ext_of(user_text)
-    normalized = {e if e.startswith(".") else f".{e}" for e in (ImageExtensions if isinstance(ImageExtensions, (list, set, tuple)) else [])}
-    if not normalized:
-        # Fallback if ImageExtensions is not provided
-        normalized = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff", ".tif", ".gif"}
-    return ext in normalized
+    return bool(user_text) and _IMG_RE.match(user_text) is not None
 
+@functools.lru_cache(maxsize=256)
 def _json_path_for_image(image_path_or_url: str) -> str:
     """Return the JSON filename that corresponds to the image (next to it or derived from URL)."""
-    p = image_path_or_url.strip().strip("'").strip('"')
+    p = _unquote(image_path_or_url)
     if p.lower().startswith(("http://", "https://")):
         parsed = urlparse(p)
         base = os.path.basename(parsed.path) or "image"
@@ -146,6 +380,8 @@ parser.add_argument("--disable-stats", action="store_true", help="suppress gener
 parser.add_argument("--save-json-by-image", action="store_true",
                     help="After each bot reply, append JSON bound to the last image path/URL provided in chat. JSON filename is <image_path>.json")
 parser.add_argument("--json-indent", type=int, default=2, help="Indentation for JSON (0 to minify)")
+parser.add_argument("--json-mode", type=str, default="full", choices=["full", "jsonl"],
+                    help="'full' rewrites <image>.json each turn; 'jsonl' writes <image>.header.json once and appends one line per turn to <image>.jsonl")
 
 # HTTP server mode
 parser.add_argument("--server", action="store_true",
@@ -161,6 +397,11 @@ parser.add_argument(
 )
 
 args = parser.parse_args()
+args.forward_url = (args.forward_url or "").strip()
+
+# ANSI start/end sequences for the reply color, so streamed tokens can be
+# written raw instead of formatting a cprint() per token
+_REPLY_ON, _REPLY_OFF = colored("\0", args.reply_color).split("\0")
 
 prompts = load_prompts(args.prompt)
 interrupt = KeyboardInterrupt()
@@ -189,10 +430,123 @@ model = NanoLLM.from_pretrained(
 
 chat_history = ChatHistory(model, args.chat_template, args.system_prompt)
 
+def _reset_chat_history():
+    """
+    Clear the chat back to the system prompt.
+    When a KV cache is held, pop back to the system prompt instead of a full
+    reset() so its prefix stays in the cache and isn't re-filled next request.
+    Caches that can't pop (KVCacheHF) or are out of sync fall back to reset().
+    """
+    if chat_history.kv_cache and len(chat_history) > 1 and chat_history[0].role == "system":
+        try:
+            chat_history.pop(len(chat_history) - 1)
+            return
+        except (NotImplementedError, ValueError) as e:
+            logging.debug(f"KV cache pop failed ({e}), resetting chat history")
+    chat_history.reset()
+
 # ---------------------------
 # Append & Forward
 # ---------------------------
 
+# per-image JSON documents already loaded this session (json_path -> (signature, doc)),
+# reused while the file(s) on disk still have the (mtime_ns, size) we last left them at
+_DOC_CACHE: dict[str, tuple] = {}
+
+def _doc_signature(json_path: str) -> tuple:
+    """(mtime_ns, size) of the file(s) backing json_path, None for missing ones."""
+    sig = []
+    for path in (_jsonl_paths(json_path) if args.json_mode == "jsonl" else (json_path,)):
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+# forwarding runs off the generate path; the semaphore bounds queued uploads
+_FORWARD_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="forward")
+_FORWARD_SLOTS = threading.BoundedSemaphore(8)
+# atexit handlers run after the threading exit hooks, i.e. after the _PERSIST_POOL
+# drain below has queued its last uploads, so those are still sent
+atexit.register(_FORWARD_POOL.shutdown, wait=True)
+
+def _persist_local(json_path: str, doc: dict, indent: int = 2):
+    """Write the per-image JSON document next to the image."""
+    with open(json_path, "wb") as f:
+        f.write(_dumps_json(doc, indent=indent))
+
+    cprint(f"[saved] {json_path}", "cyan")
+
+def _persist_jsonl(json_path: str, doc: dict, record: dict):
+    """
+    Append-only variant of _persist_local() for --json-mode=jsonl: the header is
+    written once, then each turn is a single O_APPEND write of one line.
+    """
+    header_path, lines_path = _jsonl_paths(json_path)
+
+    if not os.path.exists(header_path):
+        header = {k: v for k, v in doc.items() if k != "entries"}
+        with open(header_path, "wb") as f:
+            f.write(_dumps_json(header))
+
+    with open(lines_path, "ab", buffering=0) as f:
+        f.write(_dumps_json(record, indent=None) + b"\n")
+
+    cprint(f"[saved] {lines_path}", "cyan")
+
+# sha256 of images the receiver already has (digest -> forward_url), LRU-bounded;
+# repeat turns on the same image send only the digest instead of the bytes
+_SENT_IMAGES: "OrderedDict[str, str]" = OrderedDict()
+_SENT_MAX = 128
+_SENT_LOCK = threading.Lock()
+
+def _image_was_sent(forward_url: str, digest: str) -> bool:
+    with _SENT_LOCK:
+        if _SENT_IMAGES.get(digest) != forward_url:
+            return False
+        _SENT_IMAGES.move_to_end(digest)
+        return True
+
+def _mark_image_sent(forward_url: str, digest: str):
+    with _SENT_LOCK:
+        _SENT_IMAGES[digest] = forward_url
+        _SENT_IMAGES.move_to_end(digest)
+        while len(_SENT_IMAGES) > _SENT_MAX:
+            _SENT_IMAGES.popitem(last=False)
+
+def _forward_remote(forward_url: str, out_doc: dict, image_path_or_url: str):
+    """
+    POST 'out_doc' to the remote receiver as multipart/form-data, with the raw
+    image bytes attached unless the receiver already has that image.
+    """
+    try:
+        fields = {"doc": _dumps_json(out_doc, indent=None)}
+        files = {}
+
+        img_src, base_name, ext, digest = _load_image(image_path_or_url)
+        if img_src:
+            fields["image_sha256"] = digest.encode("ascii")
+            fields["image_name"] = f"{base_name}{ext}".encode("utf-8")
+            if not _image_was_sent(forward_url, digest):
+                files["image"] = (f"{base_name}{ext}", img_src)
+
+        status, body = _http_post_multipart(forward_url, fields, files, timeout=10.0)
+        if status == 409 and digest and not files:
+            # receiver no longer knows this digest (e.g. it restarted), send the bytes
+            files["image"] = (f"{base_name}{ext}", img_src)
+            status, body = _http_post_multipart(forward_url, fields, files, timeout=10.0)
+
+        if status in (200, 201):
+            if digest:
+                _mark_image_sent(forward_url, digest)
+            what = "JSON+image" if files else "JSON (image by digest)" if digest else "JSON"
+            cprint(f"[forward] posted {what} to {forward_url} (status {status})", "cyan")
+        else:
+            cprint(f"[forward][warn] failed to POST to {forward_url} (status {status}): {body}", "yellow")
+    finally:
+        _FORWARD_SLOTS.release()
+
 def _append_entry_to_json(
     json_path: str,
     image_path_or_url: str,
@@ -202,8 +556,9 @@ def _append_entry_to_json(
     indent: int = 2
 ):
     """
-    Append a single {timestamp, prompt, response} record into the per-image JSON file.
-    Then forward the entire JSON document to args.forward_url (if set).
+    Append a single {timestamp, prompt, response} record into the per-image JSON file
+    (or its JSONL sidecar with --json-mode=jsonl).
+    Then queue the entire JSON document for forwarding to args.forward_url (if set).
     """
     record = {
         "timestamp": int(time.time()),
@@ -211,17 +566,23 @@ def _append_entry_to_json(
         "response": reply_text,
     }
 
-    doc = None
-    if os.path.exists(json_path):
+    # Only re-read the file when something else changed it since our last write
+    sig = _doc_signature(json_path)
+    cached = _DOC_CACHE.get(json_path)
+    doc = cached[1] if cached is not None and cached[0] == sig else None
+    if doc is None:
         try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                doc = json.load(f)
+            if args.json_mode == "jsonl":
+                doc = compact_json(json_path) if any(map(os.path.exists, _jsonl_paths(json_path))) else None
+            elif os.path.exists(json_path):
+                with open(json_path, "rb") as f:
+                    doc = _loads_json(f.read())
         except Exception:
             doc = None
 
     if not isinstance(doc, dict):
         doc = {
-            "image_path": image_path_or_url.strip().strip("'").strip('"'),
+            "image_path": image_path_or_url,
             "model": getattr(model, "repo_id", None) or getattr(model, "name", None),
             "api": getattr(model, "api", None),
             "entries": []
@@ -229,75 +590,103 @@ def _append_entry_to_json(
 
     doc.setdefault("entries", [])
     doc["entries"].append(record)
+    _DOC_CACHE.pop(json_path, None)  # stays out if the write below fails
 
-    # Persist locally
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(doc, f, ensure_ascii=False, indent=indent)
-
-    cprint(f"[saved] {json_path}", "cyan")
+    if args.json_mode == "jsonl":
+        _persist_jsonl(json_path, doc, record)
+    else:
+        _persist_local(json_path, doc, indent=indent)
+    _DOC_CACHE[json_path] = (_doc_signature(json_path), doc)
 
     # Forward to remote receiver if configured
-    forward_url = (args.forward_url or "").strip()
+    forward_url = args.forward_url
     if forward_url:
-        # Shallow copy so we don't persist transient fields locally
+        # Copy so the background upload sees a stable entries list
         out_doc = dict(doc)
+        out_doc["entries"] = list(doc["entries"])
+
+        _FORWARD_SLOTS.acquire()  # blocks only when 8 uploads are already pending
+        try:
+            _FORWARD_POOL.submit(_forward_remote, forward_url, out_doc, image_path_or_url)
+        except RuntimeError:
+            # pool already shut down (interpreter exit): upload inline, which also releases the slot
+            _forward_remote(forward_url, out_doc, image_path_or_url)
 
-        # Attach image bytes (if available)
-        img_bytes, base_name, ext = _read_image_bytes(image_path_or_url)
-        if img_bytes:
-            out_doc["_image_basename"] = base_name
-            out_doc["_image_ext"] = ext
-            out_doc["_image_b64"] = base64.b64encode(img_bytes).decode("ascii")
 
-        status, body = _http_post_json(forward_url, out_doc, timeout=10.0)
-        if status in (200, 201):
-            cprint(f"[forward] posted JSON+image to {forward_url} (status {status})", "cyan")
-        else:
-            cprint(f"[forward][warn] failed to POST to {forward_url} (status {status}): {body}", "yellow")
 
+# single worker: entries for an image are written in order, and _DOC_CACHE is
+# only ever touched from this thread
+_PERSIST_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist")
+
+# concurrent.futures refuses new work once its own exit hook has run, and the
+# persist jobs still queued at exit submit uploads to _FORWARD_POOL. Threading
+# exit hooks run in reverse order, so this drain (registered after that hook)
+# runs first and the last turns of a --prompt list are still forwarded.
+threading._register_atexit(functools.partial(_PERSIST_POOL.shutdown, wait=True))
+
+def _persist_and_forward(**kwargs):
+    """Run _append_entry_to_json() on _PERSIST_POOL, logging instead of losing errors."""
+    try:
+        _append_entry_to_json(**kwargs)
+    except Exception as e:
+        cprint(f"[error] failed to save JSON for {kwargs.get('image_path_or_url')}: {e}", "red")
 
 
 # ---------------------------
 # Single "run cycle"
 # ---------------------------
 
+# covers chat_history + embed/generate only; saving/forwarding happen on
+# _PERSIST_POOL/_FORWARD_POOL outside of it
 _run_lock = threading.Lock()
 
-def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
+def process_user_prompt(user_prompt: str, *, generate: bool = True, use_cache: bool = False) -> str:
     """
     Execute one cycle:
     - Detect if prompt is an image path/URL and update last_image_path.
-    - Append user prompt.
-    - Optionally embed_chat + generate with the model.
+    - Append user prompt (use_cache=True keeps its tokens/embedding for fixed prompts).
+    - Optionally embed_chat + generate with the model; with a KV cache from the
+      previous turn only the new messages are embedded and prefilled.
     - Append bot reply.
     - Optionally save JSON bound to last_image_path.
     Returns the textual reply produced by the model (or "" if generate=False).
     """
     global last_image_path
 
-    # Detect image path/URL
-    if _is_image_path_or_url(user_prompt):
-        last_image_path = user_prompt.strip().strip("'").strip('"')
+    # Detect image path/URL (unquoted once, the cleaned value is used from here on);
+    # URL images are downloaded once and shared with the forwarder
+    image = None
+    image_path = _unquote(user_prompt)
+    if _is_image_path_or_url(image_path):
+        last_image_path = image_path
+        if image_path.lower().startswith(("http://", "https://")):
+            image = _prefetched_image(image_path)
 
     # Append user message into chat history
-    chat_history.append("user", user_prompt)
+    if image is not None:
+        chat_history.append("user", image=image)
+    else:
+        chat_history.append("user", user_prompt, use_cache=use_cache)
 
     # If we only want to append (no generation), exit early
     if not generate:
         return ""
 
     # Embed step
-    t0 = time.perf_counter()
+    # timing is sampled at embed, first token and end only; printed unless --disable-stats
+    _now = time.perf_counter
+    show_stats = not args.disable_stats
+    t0 = _now()
     embedding, position = chat_history.embed_chat(
         max_tokens=model.config.max_length - args.max_new_tokens,
         wrap_tokens=args.wrap_tokens,
         use_cache=model.has_embed and chat_history.kv_cache,
     )
-    t1 = time.perf_counter()
-    print(f"[TICTOK] embed_chat: {(t1 - t0)*1000:.2f} ms")
+    if show_stats:
+        print(f"[TICTOK] embed_chat: {(_now() - t0)*1000:.2f} ms")
 
     # Generate step (exception-safe)
-    gen_start = time.perf_counter()
+    gen_start = _now()
     try:
         reply = model.generate(
             embedding,
@@ -315,6 +704,7 @@ def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
     except Exception as e:
         cprint(f"[error] generate() failed: {e}", "red")
         chat_history.append("bot", f"[error] generation failed: {e}")
+        chat_history.kv_cache = None  # the new messages were embedded but never prefilled
         return f"[error] generation failed: {e}"
 
     reply_text = ""
@@ -322,20 +712,24 @@ def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
         # Non-streaming mode: reply is a single string
         reply_text = reply
         cprint(reply_text, args.reply_color)
-        gen_end = time.perf_counter()
-        print(f"[TICTOK] generate_total: {(gen_end - gen_start):.3f}s")
+        if show_stats:
+            print(f"[TICTOK] generate_total: {(_now() - gen_start):.3f}s")
     else:
         # Streaming mode: reply yields tokens
         first_token_time = None
         token_count = 0
+        reply_parts = []
         for token in reply:
-            now = time.perf_counter()
             if first_token_time is None:
-                first_token_time = now
-                print(f"[TICTOK] TTFT: {(first_token_time - gen_start)*1000:.2f} ms")
-            cprint(token, args.reply_color, end="", flush=True)
-            reply_text += token
+                first_token_time = _now()
+                if show_stats:
+                    print(f"[TICTOK] TTFT: {(first_token_time - gen_start)*1000:.2f} ms")
+                sys.stdout.write(_REPLY_ON)
+            sys.stdout.write(token)
+            reply_parts.append(token)
             token_count += 1
+            if token_count % 8 == 0:
+                sys.stdout.flush()
             if interrupt:
                 try:
                     reply.stop()
@@ -344,9 +738,13 @@ def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
                 interrupt.reset()
                 break
 
-        gen_end = time.perf_counter()
+        sys.stdout.write(_REPLY_OFF)
+        sys.stdout.flush()
+        reply_text = "".join(reply_parts)
+
+        gen_end = _now()
         total_time = gen_end - gen_start
-        if token_count > 0:
+        if show_stats and token_count > 0:
             throughput = token_count / (gen_end - (first_token_time or gen_start))
             print(f"\n[TICTOK] generate_total: {total_time:.3f}s | tokens: {token_count} | throughput: {throughput:.2f} tok/s")
 
@@ -356,14 +754,19 @@ def process_user_prompt(user_prompt: str, *, generate: bool = True) -> str:
         print_table(model.stats)
         print("")
 
-    # Append bot reply to chat history
-    chat_history.append("bot", reply_text)
+    # Append bot reply to chat history (the streaming response also carries the kv_cache)
+    if not args.disable_streaming and reply_text == reply.text:
+        chat_history.append("bot", reply)
+    else:
+        chat_history.append("bot", reply_text)
+        chat_history.kv_cache = None  # out of sync with the text, re-fill on the next turn
 
-    # Save JSON per image if enabled (this also forwards the JSON)
+    # Save JSON per image if enabled (queued; this also queues the JSON for forwarding)
     if args.save_json_by_image:
         if last_image_path:
             json_path = _json_path_for_image(last_image_path)
-            _append_entry_to_json(
+            _PERSIST_POOL.submit(
+                _persist_and_forward,
                 json_path=json_path,
                 image_path_or_url=last_image_path,
                 model=model,
@@ -385,6 +788,9 @@ if args.server:
     # Lazy import so Flask is only required in --server mode.
     from flask import Flask, request, jsonify
 
+    # fixed per-image prompt, its templated embedding is cached after the first request
+    AUTO_PROMPT = "Describe the image"
+
     app = Flask(__name__)
 
     @app.route("/describe", methods=["POST"])
@@ -402,7 +808,7 @@ if args.server:
           - Auto-inject "Describe the image" and generate.
           - If 'question' provided, ask it as a second turn and generate.
           - JSON-by-image saving remains intact via process_user_prompt
-            (which also forwards the JSON to args.forward_url).
+            (which also queues the JSON for forwarding to args.forward_url).
         """
         body = request.get_json(force=True, silent=False) or {}
         image_path = (body.get("image_path") or "").strip()
@@ -411,19 +817,25 @@ if args.server:
         if not image_path:
             return jsonify({"error": "image_path is required"}), 400
 
+        # start fetching URL images while waiting on the lock / resetting the chat
+        if image_path.lower().startswith(("http://", "https://")):
+            _prefetch_image_url(_unquote(image_path))
+
         with _run_lock:
-            # RESET between requests
-            chat_history.reset()
+            # RESET between requests (keeps the system prompt KV prefix when cached)
+            _reset_chat_history()
             globals()['last_image_path'] = None
 
             # 1) add the image to history (no generation)
             process_user_prompt(image_path, generate=False)
 
-            # 2) auto prompt
-            auto_prompt = "Describe the image"
-            resp_describe = process_user_prompt(auto_prompt, generate=True)
+            # 2) auto prompt (fixed text, so its embedding is cached across requests);
+            #    image + prompt are prefilled here once
+            auto_prompt = AUTO_PROMPT
+            resp_describe = process_user_prompt(auto_prompt, generate=True, use_cache=True)
 
-            # 3) optional follow-up
+            # 3) optional follow-up: continues from the KV cache of turn 2, so only
+            #    the question tokens are embedded/prefilled, not the image again
             resp_question = None
             if question:
                 resp_question = process_user_prompt(question, generate=True)
@@ -442,7 +854,7 @@ if args.server:
         return jsonify({"ok": True, "time": int(time.time())})
 
     # Start the server and exit the CLI flow
-    app.run(host="0.0.0.0", port=args.port)
+    app.run(host="0.0.0.0", port=args.port, threaded=True)
     sys.exit(0)
 
 
@@ -50,6 +50,7 @@ NANOOWL_TIMEOUT = 45.0       # NanoOWL infer timeout
 NANOOWL_ANNOTATE = 0         # annotate flag sent to NanoOWL (0/1)
 
 _ANN_RE = re.compile(r"_ann\.(jpg|jpeg|png)$", re.IGNORECASE)
+_ANN_SUFFIX_RE = re.compile(r"_ann$", re.IGNORECASE)
 
 FORWARD_JSON_URL = None       # e.g., http://172.17.16.9:9090/ingest
 FORWARD_JSON_TIMEOUT = 8.0
@@ -299,7 +300,7 @@ def _annotate_from_json(image_path: str, json_path: str):
 
     base, _ = os.path.splitext(image_path)
 
-    base = re.sub(r"_ann$", "", base, flags=re.IGNORECASE)
+    base = _ANN_SUFFIX_RE.sub("", base)
     out_path = base + "_ann.jpg"
 
     ok = cv2.imwrite(out_path, img, [int(cv2.IMWRITE_JPEG_QUALITY), 92])
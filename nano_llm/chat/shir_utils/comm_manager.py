@@ -23,7 +23,7 @@ Notes:
 - It stores OWL results locally in the image's JSON and renders an annotated image.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 import os
 import json
 import time
@@ -32,10 +32,18 @@ import argparse
 from collections import deque
 import hashlib
 import re
-import urllib.request, urllib.error  # for Jetson2 JSON POST
-import requests                      # for NanoOWL multipart
+import threading
+import requests                      # for Jetson2 JSON POST + NanoOWL multipart
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import cv2                           # for drawing boxes
 
+try:
+    import orjson
+    HAS_ORJSON=True
+except ImportError:
+    HAS_ORJSON=False
+
 app = Flask(__name__)
 
 # --- Runtime configuration (populated from CLI args) ---
@@ -50,9 +58,10 @@ NANOOWL_TIMEOUT = 45.0       # NanoOWL infer timeout
 NANOOWL_ANNOTATE = 0         # annotate flag sent to NanoOWL (0/1)
 
 _ANN_RE = re.compile(r"_ann\.(jpg|jpeg|png)$", re.IGNORECASE)
+_ANN_SUFFIX_RE = re.compile(r"_ann$", re.IGNORECASE)
 
 # --- Simple in-memory log/state for quick debugging ---
-HISTORY = deque(maxlen=200)
+HISTORY = deque(maxlen=200)      # newest first, each entry pre-serialized JSON bytes
 LAST = {
     "vila_caption": None,        # {"ts": int, "text": str}
     "jetson2_prompts": None,     # {"ts": int, "prompts": [str]}
@@ -61,27 +70,59 @@ LAST = {
     "nanoowl_result": None,      # {"status": int, "body": any}
 }
 
+# HISTORY/LAST are only mutated through _update_state(), which also re-renders
+# the /latest response body so GETs serve cached bytes
+_STATE_LOCK = threading.Lock()
+
+def _dumps(obj) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+
+def _render_latest() -> bytes:
+    return _dumps({"ok": True, "last": LAST})
+
+_LATEST_CACHE = _render_latest()
+
+def _update_state(history: dict = None, **last):
+    """Apply LAST[key] = value updates and an optional HISTORY entry atomically."""
+    global _LATEST_CACHE
+    entry = _dumps(history) if history is not None else None
+    with _STATE_LOCK:
+        LAST.update(last)
+        if entry is not None:
+            HISTORY.appendleft(entry)
+        _LATEST_CACHE = _render_latest()
+
+# --- Keep-alive HTTP sessions ---
+
+def _make_session(retries: int = 0) -> requests.Session:
+    """
+    Pooled session; with retries > 0, failed connects/reads and 408/5xx answers
+    are retried on the same pool with exponential backoff (0.25s, 0.5s, 1s, ...).
+    """
+    retry = Retry(total=retries, backoff_factor=0.25,
+                  status_forcelist=(408, 500, 502, 503, 504),
+                  allowed_methods=frozenset({"POST"}), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    sess = requests.Session()
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return sess
+
+_SESSION = _make_session()          # NanoOWL (no retries, the upload is expensive)
+_JETSON2_SESSION = _make_session()  # rebuilt in main() with --forward-retries
+
 # -------------------- Helpers --------------------
 
-def _http_post_json(url: str, payload: dict, timeout: float = 6.0):
+def _http_post_json(url: str, payload: dict, timeout: float = 6.0, session: requests.Session = None):
     """
-    POST JSON using stdlib (no requests). Returns (status_code, response_text).
+    POST JSON over a pooled session. Returns (status_code, response_text).
     """
     data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url=url,
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            status = getattr(resp, "status", 200)
-            body = resp.read().decode("utf-8", errors="replace")
-            return status, body
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8", errors="replace") if e.fp else str(e)
-        return e.code, body
+        r = (session or _SESSION).post(url, data=data, headers={"Content-Type": "application/json"}, timeout=timeout)
+        return r.status_code, r.text
     except Exception as e:
         return -1, str(e)
 
@@ -162,7 +203,7 @@ def _post_nanoowl_multipart(endpoint: str, image_path: str, prompts: list[str],
     files = {"image": (os.path.basename(image_path), open(image_path, "rb"), "application/octet-stream")}
     data = {"prompts": json.dumps(prompts or []), "annotate": str(int(annotate))}
     try:
-        r = requests.post(endpoint, files=files, data=data, timeout=timeout)
+        r = _SESSION.post(endpoint, files=files, data=data, timeout=timeout)
         try:
             body = r.json()
         except Exception:
@@ -292,7 +333,7 @@ def _annotate_from_json(image_path: str, json_path: str):
 
     base, _ = os.path.splitext(image_path)
 
-    base = re.sub(r"_ann$", "", base, flags=re.IGNORECASE)
+    base = _ANN_SUFFIX_RE.sub("", base)
     out_path = base + "_ann.jpg"
 
     ok = cv2.imwrite(out_path, img, [int(cv2.IMWRITE_JPEG_QUALITY), 92])
@@ -321,22 +362,17 @@ def from_vila():
 
     ts = int(time.time())
     print(f"[from_vila][{ts}] {caption}")
-    LAST["vila_caption"] = {"ts": ts, "text": caption}
-    HISTORY.appendleft({"src": "vila", "ts": ts, "text": caption})
+    _update_state(history={"src": "vila", "ts": ts, "text": caption},
+                  vila_caption={"ts": ts, "text": caption})
 
     # ---- 1) Send to Jetson2 and wait for prompts ----
     f_status, f_body, prompts = None, None, None
     if JETSON2_ENDPOINT:
-        last_err = None
-        for attempt in range(1, int(FORWARD_RETRIES or 1) + 1):
-            f_status, f_body = _http_post_json(
-                JETSON2_ENDPOINT, {"sentence": caption}, timeout=float(FORWARD_TIMEOUT or 10.0)
-            )
-            if f_status not in (-1, 408, 504) and not (isinstance(f_status, int) and f_status >= 500):
-                break
-            last_err = f_body
-            print(f"[forward->jetson2] attempt {attempt} failed: status={f_status} body={str(f_body)[:180]}")
-            time.sleep(min(2.0 * attempt, 6.0))
+        # retries/backoff happen inside _JETSON2_SESSION (see _make_session)
+        f_status, f_body = _http_post_json(
+            JETSON2_ENDPOINT, {"sentence": caption},
+            timeout=float(FORWARD_TIMEOUT or 10.0), session=_JETSON2_SESSION
+        )
 
         print(f"[forward->jetson2] status={f_status} body={f_body[:180] if isinstance(f_body, str) else f_body}")
         try:
@@ -346,12 +382,14 @@ def from_vila():
         except Exception:
             prompts = None
 
-        LAST["last_forward_status"] = {"status": f_status, "body": f_body}
         if prompts:
-            LAST["jetson2_prompts"] = {"ts": int(time.time()), "prompts": prompts}
-            HISTORY.appendleft({"src": "jetson2", "ts": int(time.time()), "prompts": prompts})
+            now_ts = int(time.time())
+            _update_state(history={"src": "jetson2", "ts": now_ts, "prompts": prompts},
+                          last_forward_status={"status": f_status, "body": f_body},
+                          jetson2_prompts={"ts": now_ts, "prompts": prompts})
             print(f"[jetson2][prompts] {prompts}")
         else:
+            _update_state(last_forward_status={"status": f_status, "body": f_body})
             print("[jetson2][warn] no prompts parsed")
 
     if not prompts:
@@ -364,7 +402,7 @@ def from_vila():
 
     # ---- 2) Find latest image + sidecar JSON ----
     img_path, json_path = _find_latest_image_and_json(CAPTURES_ROOT)
-    LAST["last_image_path"] = img_path
+    _update_state(last_image_path=img_path)
     if not img_path:
         print(f"[nanoowl][warn] no image found under {CAPTURES_ROOT}")
         return jsonify({
@@ -384,7 +422,7 @@ def from_vila():
         annotate=NANOOWL_ANNOTATE,
         timeout=NANOOWL_TIMEOUT
     )
-    LAST["nanoowl_result"] = {"status": status, "body": body if not isinstance(body, str) else body[:2000]}
+    _update_state(nanoowl_result={"status": status, "body": body if not isinstance(body, str) else body[:2000]})
     print(f"[nanoowl] status={status} body_type={'json' if isinstance(body, dict) else 'text'}")
 
     # ---- 4) Write NanoOWL result to sidecar JSON ----
@@ -422,7 +460,14 @@ def from_vila():
 
 @app.get("/latest")
 def latest():
-    return jsonify({"ok": True, "last": LAST})
+    return Response(_LATEST_CACHE, mimetype="application/json")
+
+
+@app.get("/history")
+def history():
+    with _STATE_LOCK:
+        body = b"[" + b",".join(HISTORY) + b"]"
+    return Response(body, mimetype="application/json")
 
 
 @app.get("/health")
@@ -435,6 +480,7 @@ def health():
 def main():
     global JETSON2_ENDPOINT, NANOOWL_ENDPOINT, CAPTURES_ROOT
     global FORWARD_TIMEOUT, FORWARD_RETRIES, NANOOWL_TIMEOUT, NANOOWL_ANNOTATE
+    global _JETSON2_SESSION
 
     p = argparse.ArgumentParser()
     p.add_argument("--host", default="0.0.0.0")
@@ -468,12 +514,15 @@ def main():
     NANOOWL_TIMEOUT = args.nanoowl_timeout
     NANOOWL_ANNOTATE = int(args.nanoowl_annotate)
 
+    # --forward-retries counts attempts, Retry(total=...) counts re-tries
+    _JETSON2_SESSION = _make_session(retries=max(int(FORWARD_RETRIES or 1) - 1, 0))
+
     print(f"[comm_manager] listening on {args.host}:{args.port}")
     print(f"  jetson2_endpoint = {JETSON2_ENDPOINT}")
     print(f"  captures_root    = {CAPTURES_ROOT}")
     print(f"  nanoowl_endpoint = {NANOOWL_ENDPOINT} (annotate={NANOOWL_ANNOTATE})")
 
-    app.run(host=args.host, port=args.port)
+    app.run(host=args.host, port=args.port, threaded=True)
 
 
 if __name__ == "__main__":
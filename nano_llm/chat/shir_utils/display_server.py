@@ -7,7 +7,8 @@ What it does
 ------------
 - Serves a lightweight web UI that shows every <image + description> pair received
   into an "ingested" directory (from your receiver `/ingest`).
-- Auto-refreshes every 2 seconds to pick up new arrivals.
+- Pushes an update to open pages (Server-Sent Events on /events) as soon as a new
+  arrival is indexed; browsers without EventSource poll every --scan-interval.
 - Click a card to open a modal with a large preview and the raw JSON metadata.
 
 Assumptions about files in ROOT_DIR
@@ -28,25 +29,80 @@ Dependencies
 ------------
 - Flask only (no sockets or DB needed)
   pip install flask
+- Optional: inotify_simple (Linux) for instant, rescan-free updates
+  pip install inotify_simple
+  Without it the index is refreshed by a background rescan every --scan-interval.
+- Optional: ijson, to read only the displayed keys out of large JSONs
+  pip install ijson
+- Optional: orjson, for faster /api/items encoding
+  pip install orjson
+- Optional: msgpack, for the compact column-packed /api/items.msgpack endpoint
+  pip install msgpack
+- Optional: Pillow, to serve small WebP thumbnails (ROOT/.thumbs/) in the grid
+  pip install pillow
+  Without it the grid falls back to the full-size images.
 
 Notes
 -----
 - Designed to run on the same machine that stores the ingested folder, 
   but can also run on a different host if it mounts that folder.
 - If your receiver saves with different names, you can adapt the MATCH_GLOB below.
+- The first time a JSON is read, the extracted caption/terms are written next to it
+  as <basename>.textcache; later scans (and restarts) read that instead of the JSON.
+  If ROOT is read-only this is silently skipped.
 """
 
 import argparse
+import bisect
+import ctypes
+import errno
+import functools
+import gzip
 import json
 import mimetypes
 import os
+import queue
 import re
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from flask import Flask, jsonify, render_template_string, send_from_directory, request, abort
+from flask import Flask, Response, render_template_string, send_from_directory, request, abort, stream_with_context
+from werkzeug.exceptions import NotFound
+
+try:
+    from inotify_simple import INotify, flags as IN_FLAGS
+    HAS_INOTIFY = True
+except ImportError:
+    HAS_INOTIFY = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
 
 # -----------------
 # Config & parsing
@@ -57,7 +113,7 @@ def parse_args():
     p.add_argument("--root", required=True, help="Directory holding ingested files (images + json)")
     p.add_argument("--host", default="127.0.0.1")
     p.add_argument("--port", type=int, default=8090)
-    p.add_argument("--scan-interval", type=float, default=2.0, help="Seconds between UI auto-refreshes")
+    p.add_argument("--scan-interval", type=float, default=2.0, help="Seconds between background rescans/run-dir checks (and UI polls without SSE)")
     p.add_argument("--latest-only", action="store_true",help="Show only the most-recent subfolder under --root (auto-updates on refresh)")
 
     return p.parse_args()
@@ -67,7 +123,11 @@ def parse_args():
 # -----------------
 
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp"}
+IMAGE_EXTS_NOEXT = frozenset(e[1:] for e in IMAGE_EXTS)
 JSON_EXT = ".json"
+THUMBS_DIR = ".thumbs"         # ROOT/.thumbs/<image_rel>.webp
+THUMB_SIZE = (512, 512)
+TEXTCACHE_EXT = ".textcache"   # tiny pre-extracted {text, llm_terms, owl_labels} beside each JSON
 
 @dataclass
 class Item:
@@ -83,6 +143,35 @@ class Item:
 # Utilities
 # -----------------
 
+def _dumps_json(doc) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(doc)
+    return json.dumps(doc, separators=(",", ":")).encode("utf-8")
+
+GZIP_MIN_SIZE = 512   # below this gzip framing isn't worth it
+PAGE_SIZE = 200       # cards per UI page; the refresher pre-builds /api/items?limit=PAGE_SIZE
+_GZIP_TYPES = ("application/json", "text/html")
+
+def _gzip(data: bytes) -> bytes:
+    # level 1: nearly all of the win on repetitive JSON/HTML at a fraction of the CPU
+    return gzip.compress(data, compresslevel=1)
+
+def _accepts_gzip() -> bool:
+    return "gzip" in request.headers.get("Accept-Encoding", "")
+
+def _gzip_etag(etag: str) -> str:
+    """Strong ETag for the gzip bytes of the representation tagged etag ('"x"' -> '"x-gz"')."""
+    return etag[:-1] + '-gz"'
+
+# /api/items.msgpack: item keys sent once as "cols", items as positional "rows"
+ITEM_COLS = ("basename", "image", "thumb", "json", "mtime", "text", "llm_terms", "owl_labels")
+
+def _pack_items(doc: Dict) -> bytes:
+    packed = {k: v for k, v in doc.items() if k != "items"}
+    packed["cols"] = ITEM_COLS
+    packed["rows"] = [[it[c] for c in ITEM_COLS] for it in doc["items"]]
+    return msgpack.packb(packed, use_bin_type=True)
+
 def _extract_llm_terms(doc: Dict) -> List[str]:
     try:
         terms = doc.get("nanoowl", {}).get("prompts", [])
@@ -120,15 +209,15 @@ def _extract_owl_labels(doc: Dict) -> List[str]:
 
 
 
-def _ann_variant(path: Path) -> Path:
-    """Return <basename>_ann.jpg next to the original image."""
-    return path.with_suffix("").with_name(path.stem + "_ann").with_suffix(".jpg")
+def _ann_variant(base: str) -> str:
+    """Return <basename>_ann.jpg next to the original image (base = path without extension)."""
+    return base + "_ann.jpg"
 
 
 def _latest_run_dir(root: Path) -> Optional[Path]:
-    """Return newest immediate subdirectory under root (by mtime)."""
+    """Return newest immediate subdirectory under root (by mtime), skipping hidden ones (.thumbs, .by_sha256)."""
     try:
-        subdirs = [d for d in root.iterdir() if d.is_dir()]
+        subdirs = [d for d in root.iterdir() if d.is_dir() and not d.name.startswith(".")]
         if not subdirs:
             return None
         subdirs.sort(key=lambda d: d.stat().st_mtime, reverse=True)
@@ -136,99 +225,520 @@ def _latest_run_dir(root: Path) -> Optional[Path]:
     except Exception:
         return None
 
-def _is_image(path: Path) -> bool:
-    return path.suffix.lower() in IMAGE_EXTS
+# text keys after entries[0].response, in priority order
+_TEXT_KEYS = ("response_describe", "description", "caption", "summary", "output", "response")
+
 
+def _clean(v) -> Optional[str]:
+    """Stripped string without </s>, or None if v is not a non-blank string."""
+    if isinstance(v, str):
+        s = v.strip()
+        if s:
+            return s.replace("</s>", "").strip()
+    return None
 
-def _best_json_for_image(img_path: Path) -> Optional[Path]:
-    """Return JSON that sits next to the image (same basename + .json)."""
-    cand = img_path.with_suffix(JSON_EXT)
-    return cand if cand.exists() else None
 
 def _extract_text(doc: dict) -> str:
     """
     Extract clean human-readable text for display.
     Priority: entries[0].response → response_describe → fallback keys.
     """
+    entries = doc.get("entries")
+    if isinstance(entries, list) and entries and isinstance(entries[0], dict):
+        v = _clean(entries[0].get("response"))
+        if v is not None:
+            return v
+    for key in _TEXT_KEYS:
+        v = _clean(doc.get(key))
+        if v is not None:
+            return v
+    return "(no textual description found in JSON)"
+
+
+# statx(2) mtime probe: asks only for type+mtime and, with AT_STATX_DONT_SYNC,
+# lets network mounts (NFS/SMB shares of the ingest folder) answer from their
+# attribute cache instead of a server round-trip. Falls back to os.stat.
+_AT_FDCWD = -100
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_TYPE = 0x0001
+_STATX_MTIME = 0x0040
+
+
+class _StatxTimestamp(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_int64), ("tv_nsec", ctypes.c_uint32), ("_reserved", ctypes.c_int32)]
+
+
+class _Statx(ctypes.Structure):
+    # struct statx is 256 bytes; only fields up to stx_mtime are read
+    _fields_ = [
+        ("stx_mask", ctypes.c_uint32), ("stx_blksize", ctypes.c_uint32),
+        ("stx_attributes", ctypes.c_uint64),
+        ("stx_nlink", ctypes.c_uint32), ("stx_uid", ctypes.c_uint32), ("stx_gid", ctypes.c_uint32),
+        ("stx_mode", ctypes.c_uint16), ("_spare0", ctypes.c_uint16),
+        ("stx_ino", ctypes.c_uint64), ("stx_size", ctypes.c_uint64), ("stx_blocks", ctypes.c_uint64),
+        ("stx_attributes_mask", ctypes.c_uint64),
+        ("stx_atime", _StatxTimestamp), ("stx_btime", _StatxTimestamp),
+        ("stx_ctime", _StatxTimestamp), ("stx_mtime", _StatxTimestamp),
+        ("_spare", ctypes.c_uint8 * 128),
+    ]
+
+
+def _load_statx():
+    if not sys.platform.startswith("linux"):
+        return None
     try:
-        entries = doc.get("entries")
-        if isinstance(entries, list) and len(entries) > 0:
-            v = entries[0].get("response")
-            if isinstance(v, str) and v.strip():
-                return v.strip().replace("</s>", "").strip()
-    except Exception:
-        pass
+        fn = ctypes.CDLL("libc.so.6", use_errno=True).statx
+    except (OSError, AttributeError):   # no glibc / glibc < 2.28
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.POINTER(_Statx)]
+    fn.restype = ctypes.c_int
+    return fn
 
-    v = doc.get("response_describe")
-    if isinstance(v, str) and v.strip():
-        return v.strip().replace("</s>", "").strip()
 
-    for key in ("description", "caption", "summary", "output", "response"):
-        v = doc.get(key)
-        if isinstance(v, str) and v.strip():
-            return v.strip().replace("</s>", "").strip()
+_statx = _load_statx()
 
-    return "(no textual description found in JSON)"
 
+def _fast_stat_mtime(path) -> Optional[float]:
+    """st_mtime of path via statx(type|mtime), or None if it does not exist."""
+    global _statx
+    fn = _statx
+    if fn is not None:
+        buf = _Statx()
+        if fn(_AT_FDCWD, os.fsencode(path), _AT_STATX_DONT_SYNC, _STATX_TYPE | _STATX_MTIME, ctypes.byref(buf)) == 0:
+            ts = buf.stx_mtime
+            return ts.tv_sec + ts.tv_nsec * 1e-9
+        err = ctypes.get_errno()
+        if err in (errno.ENOENT, errno.ENOTDIR):
+            return None
+        if err in (errno.ENOSYS, errno.EPERM, errno.EINVAL):   # old kernel / seccomp
+            _statx = None
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
 
 
-def _collect_items(root: Path, rel_root: Path) -> List[Item]:
-    items: List[Item] = []
-    seen_keys = set()  
+_SCALAR_EVENTS = ("string", "number", "boolean", "null")
 
-    for img_path in root.glob("**/*"):
-        if not img_path.is_file():
-            continue
-        if not _is_image(img_path):
-            continue
 
-        if img_path.stem.endswith("_ann"):
-            continue
+def _read_display_fields(json_path: str) -> Dict:
+    """
+    Stream the JSON with ijson and return a minimal doc holding only what the
+    _extract_* helpers look at (entries[0].response, the top-level text keys,
+    nanoowl.prompts and nanoowl.result.detections[].label). Nothing else -
+    base64 payloads, token arrays, raw OWL bodies - is ever built as Python
+    objects. The whole file is still scanned: comm_manager appends "nanoowl"
+    at the end of the document.
+    """
+    doc: Dict = {}
+    prompts: List = []
+    labels: List[Dict] = []
+    entry_idx = -1
+    with open(json_path, "rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == "entries.item":
+                if event not in ("end_map", "end_array", "map_key"):
+                    entry_idx += 1   # a new element of the entries list starts
+            elif prefix == "entries.item.response":
+                if entry_idx == 0 and event == "string":
+                    doc["entries"] = [{"response": value}]
+            elif prefix in _TEXT_KEYS:
+                if event == "string":
+                    doc[prefix] = value
+            elif prefix == "nanoowl.prompts.item":
+                if event in _SCALAR_EVENTS:
+                    prompts.append(value)
+            elif prefix == "nanoowl.result.detections.item.label":
+                if event == "string":
+                    labels.append({"label": value})
+    if prompts or labels:
+        doc["nanoowl"] = {"prompts": prompts, "result": {"detections": labels}}
+    return doc
+
+
+def _ensure_text_cache(json_path: str) -> Tuple[str, List[str], List[str]]:
+    """
+    Read <basename>.textcache if it was built from exactly this JSON (same
+    st_mtime_ns and size, stored inside the cache); otherwise extract from the
+    JSON once and write the cache atomically (tmp + os.replace).
+    """
+    cache_path = json_path[:-len(JSON_EXT)] + TEXTCACHE_EXT
+    st = os.stat(json_path)
+    src = [st.st_mtime_ns, st.st_size]
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            c = json.load(f)
+        if c["src"] == src:
+            return c["text"], c["llm_terms"], c["owl_labels"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass   # missing/torn/foreign/old-format cache -> rebuild below
+
+    if HAS_IJSON:
+        doc = _read_display_fields(json_path)
+    else:
+        with open(json_path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+    text, llm_terms, owl_labels = _extract_text(doc), _extract_llm_terms(doc) or [], _extract_owl_labels(doc) or []
+
+    tmp = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"src": src, "text": text, "llm_terms": llm_terms, "owl_labels": owl_labels}, f, ensure_ascii=False)
+        os.replace(tmp, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return text, llm_terms, owl_labels
+
+
+@functools.lru_cache(maxsize=4096)
+def _load_text(json_path: str, mtime: float) -> Tuple[str, List[str], List[str]]:
+    """
+    (text, llm_terms, owl_labels) of a sidecar JSON, memoized on (path, mtime):
+    unchanged JSONs are never re-opened by rescans/upserts, and a rewrite gets
+    a new mtime so it misses the cache. Stale paths simply age out of the LRU.
+    """
+    return _ensure_text_cache(json_path)
 
-        ann_path = _ann_variant(img_path)
-        use_path = ann_path if ann_path.exists() else img_path
 
-        key = img_path.stem
-        if key in seen_keys:
+def _make_item(img_path: str, root_prefix: str, img_mtime: Optional[float] = None) -> Optional[Item]:
+    """
+    Build the Item for one original image (None if missing / not an image / an _ann copy).
+    root_prefix is ROOT with a trailing separator; every path handed in lives under it,
+    so the *_rel strings are plain slices computed once here, never on serve.
+    Pass img_mtime when the caller already has it from scandir.
+    """
+    base, ext = os.path.splitext(img_path)
+    if ext.lower() not in IMAGE_EXTS or base.endswith("_ann"):
+        return None
+    if img_mtime is None:
+        img_mtime = _fast_stat_mtime(img_path)
+        if img_mtime is None:
+            return None
+    mtime_list = [img_mtime]
+
+    ann_path = _ann_variant(base)
+    ann_mtime = _fast_stat_mtime(ann_path)
+    use_path = img_path
+    if ann_mtime is not None:
+        use_path = ann_path
+        mtime_list.append(ann_mtime)
+
+    json_path = base + JSON_EXT
+    json_mtime = _fast_stat_mtime(json_path)
+    if json_mtime is None:
+        json_path = None
+
+    text = ""
+    llm_terms: List[str] = []
+    owl_labels: List[str] = []
+
+    if json_path:
+        try:
+            text, llm_terms, owl_labels = _load_text(json_path, json_mtime)
+            mtime_list.append(json_mtime)
+        except Exception:
+            text = "(failed to read/parse JSON)"
+
+    cut = len(root_prefix)
+    return Item(
+        basename=os.path.splitext(os.path.basename(use_path))[0],
+        image_rel=use_path[cut:],
+        json_rel=(json_path[cut:] if json_path else None),
+        mtime=max(mtime_list),
+        text=text,
+        llm_terms=llm_terms,
+        owl_labels=owl_labels,
+    )
+
+
+def _walk_images(root: str):
+    """
+    Yield (path, st_mtime) for every original image under root.
+    os.scandir with an explicit stack: directory/type checks come from readdir,
+    the extension is checked on the name, and only matching images get one statx.
+    Hidden directories (.thumbs, the receiver's .by_sha256, ...) are skipped.
+    """
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
             continue
-        seen_keys.add(key)
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith("."):
+                            stack.append(entry.path)
+                        continue
+                    stem, dot, ext = entry.name.rpartition(".")
+                    if not stem or ext.lower() not in IMAGE_EXTS_NOEXT or stem.endswith("_ann"):
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                mtime = _fast_stat_mtime(entry.path)
+                if mtime is not None:
+                    yield entry.path, mtime
+
+
+SEED_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _collect_items(top: str, root_prefix: str, parallel: bool = False) -> Dict[str, Item]:
+    """
+    Full scan of top (ROOT or a subdir of it) -> {original image path: Item}.
+    parallel=True (the cold seed scan) fans the per-image stat/JSON work out to
+    a thread pool; the GIL is released in those syscalls, so they overlap.
+    """
+    found = list(_walk_images(top))
+    if parallel and len(found) > 1:
+        with ThreadPoolExecutor(max_workers=SEED_WORKERS, thread_name_prefix="seed") as ex:
+            built = list(ex.map(lambda pm: _make_item(pm[0], root_prefix, pm[1]), found))
+    else:
+        built = [_make_item(path, root_prefix, mtime) for path, mtime in found]
+    return {path: item for (path, _), item in zip(found, built) if item is not None}
+
+
+def _owner_images(path: str) -> List[str]:
+    """Original images whose Item depends on `path` (the image, its JSON or its _ann copy)."""
+    base, ext = os.path.splitext(path)
+    ext = ext.lower()
+    if ext != JSON_EXT and ext not in IMAGE_EXTS:
+        return []
+    is_ann = base.endswith("_ann")
+    if is_ann:
+        base = base[:-len("_ann")]
+    out = {base + e for e in IMAGE_EXTS}
+    out.update(base + e.upper() for e in IMAGE_EXTS)
+    if ext in IMAGE_EXTS and not is_ann:
+        out.add(path)
+    return list(out)
 
-        json_path = _best_json_for_image(img_path)
+# -----------------
+# Thumbnails
+# -----------------
 
-        text = ""
-        llm_terms: List[str] = []
-        owl_labels: List[str] = []
-        mtime_list = [img_path.stat().st_mtime]
+_THUMBS_OK = HAS_PIL   # cleared on the first write failure (e.g. read-only ROOT)
+
+
+def _ensure_thumb(src: str, thumb: str):
+    """Write a THUMB_SIZE WebP of src to thumb (tmp + os.replace) unless it is already newer than src."""
+    global _THUMBS_OK
+    if not _THUMBS_OK:
+        return
+    src_mtime = _fast_stat_mtime(src)   # the image's own mtime, not the Item's (which includes the JSON)
+    if src_mtime is None:
+        return
+    t = _fast_stat_mtime(thumb)
+    if t is not None and t >= src_mtime:
+        return
+    tmp = f"{thumb}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(thumb), exist_ok=True)
+        with Image.open(src) as im:
+            im.draft("RGB", THUMB_SIZE)   # JPEG: decode at reduced scale
+            im.thumbnail(THUMB_SIZE, Image.BILINEAR)
+            if im.mode not in ("RGB", "RGBA"):
+                im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+            im.save(tmp, "webp", quality=75)
+        os.replace(tmp, thumb)
+    except OSError as e:
+        if isinstance(e, PermissionError) or e.errno == errno.EROFS:
+            _THUMBS_OK = False
+            print(f"[display] cannot write thumbnails ({e}); serving full images")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    except Exception as e:
+        print(f"[display] thumbnail failed for {src}: {e}")
 
-        if ann_path.exists():
-            try:
-                mtime_list.append(ann_path.stat().st_mtime)
-            except Exception:
-                pass
+# -----------------
+# Incremental index
+# -----------------
 
-        if json_path and json_path.exists():
+class ItemIndex:
+    """
+    In-memory {image path: Item} index of ROOT, kept fresh by a background thread.
+    Seeded with one full scan, then updated from inotify events (or by rescanning
+    every scan_interval when inotify_simple is unavailable). Requests only read
+    the sorted snapshot and never touch the filesystem.
+    """
+
+    def __init__(self, root: Path, scan_interval: float, on_item=None):
+        self.root = str(root)
+        self.on_item = on_item   # called with every new/changed Item (index thread)
+        self.root_prefix = os.path.join(self.root, "")
+        self.scan_interval = scan_interval
+        self.items_by_path: Dict[str, Item] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._ready = threading.Event()
+        self._dirty = True
+        self._snapshot: List[Item] = []
+        self.version = 0   # bumped on every change to items_by_path
+
+    def start(self):
+        threading.Thread(target=self._run, name="display-index", daemon=True).start()
+
+    def snapshot(self) -> List[Item]:
+        """Items newest first, one per basename; rebuilt only after a change."""
+        self._ready.wait()
+        with self._lock:
+            if self._dirty:
+                ordered = sorted(self.items_by_path.items(), key=lambda kv: kv[1].mtime, reverse=True)
+                seen_keys = set()
+                snap: List[Item] = []
+                for img_path, it in ordered:
+                    key = os.path.splitext(os.path.basename(img_path))[0]
+                    if key in seen_keys:
+                        continue
+                    seen_keys.add(key)
+                    snap.append(it)
+                self._snapshot = snap
+                self._dirty = False
+            return self._snapshot
+
+    def wait_for_change(self, version: int, timeout: Optional[float] = None) -> int:
+        """Block until version moves past `version` (or timeout); return the current version."""
+        with self._changed:
+            if self.version == version:
+                self._changed.wait(timeout)
+            return self.version
+
+    # ---- updates (index thread only) ----
+
+    def _mark_dirty(self):
+        # caller holds self._lock
+        self._dirty = True
+        self.version += 1
+        self._changed.notify_all()
+
+    def _notify(self, items):
+        if self.on_item is not None:
+            for item in items:
+                self.on_item(item)
+
+    def _replace_all(self, items: Dict[str, Item]):
+        changed = []
+        with self._lock:
+            if items != self.items_by_path:
+                old = self.items_by_path
+                changed = [it for p, it in items.items() if old.get(p) != it]
+                self.items_by_path = items
+                self._mark_dirty()
+        self._ready.set()
+        self._notify(changed)
+
+    def _merge(self, items: Dict[str, Item]):
+        if items:
+            with self._lock:
+                self.items_by_path.update(items)
+                self._mark_dirty()
+            self._notify(items.values())
+
+    def _upsert(self, paths):
+        fresh = {p: _make_item(p, self.root_prefix) for p in paths}
+        changed = []
+        with self._lock:
+            for p, item in fresh.items():
+                if item is not None:
+                    if self.items_by_path.get(p) != item:
+                        self.items_by_path[p] = item
+                        changed.append(item)
+                        self._mark_dirty()
+                elif self.items_by_path.pop(p, None) is not None:
+                    self._mark_dirty()
+        self._notify(changed)
+
+    def _drop_tree(self, top: str):
+        prefix = os.path.join(top, "")
+        with self._lock:
+            gone = [p for p in self.items_by_path if p.startswith(prefix)]
+            for p in gone:
+                del self.items_by_path[p]
+            if gone:
+                self._mark_dirty()
+
+    # ---- background loop ----
+
+    def _run(self):
+        if HAS_INOTIFY:
+            try:
+                self._watch()
+            except OSError as e:
+                print(f"[display] inotify failed ({e}); falling back to rescans every {self.scan_interval}s")
+        self._poll()
+
+    def _poll(self):
+        seeded = self._ready.is_set()
+        while True:
             try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    doc = json.load(f)
-                text = _extract_text(doc)
-                llm_terms = _extract_llm_terms(doc) or []
-                owl_labels = _extract_owl_labels(doc) or []
-                mtime_list.append(json_path.stat().st_mtime)
-            except Exception:
-                text = "(failed to read/parse JSON)"
-
-        items.append(Item(
-            basename=use_path.stem,
-            image_rel=str(use_path.relative_to(rel_root)),                 
-            json_rel=(str(json_path.relative_to(rel_root)) if json_path else None),
-            mtime=max(mtime_list),
-            text=text,
-            llm_terms=llm_terms,
-            owl_labels=owl_labels,
-        ))
-
-    items.sort(key=lambda it: it.mtime, reverse=True)
-    return items
+                self._replace_all(_collect_items(self.root, self.root_prefix, parallel=not seeded))
+                seeded = True
+            except Exception as e:
+                print(f"[display] rescan failed: {e}")
+                self._ready.set()
+            time.sleep(self.scan_interval)
+
+    def _watch(self):
+        ino = INotify()
+        mask = (IN_FLAGS.CLOSE_WRITE | IN_FLAGS.MOVED_TO | IN_FLAGS.MOVED_FROM |
+                IN_FLAGS.DELETE | IN_FLAGS.CREATE)
+        wds: Dict[int, str] = {}
+
+        def add_watches(top: str):
+            for dirpath, dirs, _files in os.walk(top):
+                dirs[:] = [d for d in dirs if not d.startswith(".")]
+                wds[ino.add_watch(dirpath, mask)] = dirpath
+
+        # watch first, then seed, so nothing written in between is missed
+        add_watches(self.root)
+        self._replace_all(_collect_items(self.root, self.root_prefix, parallel=True))
+
+        while True:
+            touched = set()
+            overflow = False
+            for ev in ino.read(read_delay=50):   # coalesce image/json/_ann bursts
+                if ev.mask & IN_FLAGS.Q_OVERFLOW:
+                    overflow = True   # wd == -1: the kernel dropped events, nothing below is complete
+                    break
+                if ev.mask & IN_FLAGS.IGNORED:
+                    wds.pop(ev.wd, None)
+                    continue
+                parent = wds.get(ev.wd)
+                if parent is None or not ev.name:
+                    continue
+                path = os.path.join(parent, ev.name)
+                if ev.mask & IN_FLAGS.ISDIR:
+                    if ev.name.startswith("."):
+                        continue
+                    if ev.mask & (IN_FLAGS.CREATE | IN_FLAGS.MOVED_TO):
+                        try:
+                            add_watches(path)
+                        except OSError as e:
+                            print(f"[display] cannot watch {path}: {e}")
+                        self._merge(_collect_items(path, self.root_prefix))
+                    elif ev.mask & (IN_FLAGS.DELETE | IN_FLAGS.MOVED_FROM):
+                        self._drop_tree(path)
+                    continue
+                if ev.mask & IN_FLAGS.CREATE:
+                    continue   # wait for CLOSE_WRITE
+                touched.update(_owner_images(path))
+            if overflow:
+                print("[display] inotify queue overflowed, rescanning")
+                try:
+                    add_watches(self.root)   # re-adding is a no-op for dirs already watched
+                except OSError as e:
+                    print(f"[display] cannot watch {self.root}: {e}")
+                self._replace_all(_collect_items(self.root, self.root_prefix))
+            elif touched:
+                self._upsert(touched)
 
 # -----------------
 # Flask app
@@ -240,29 +750,83 @@ def create_app(root_dir: Path, scan_interval: float, latest_only: bool) -> Flask
     app.config["SCAN_INTERVAL"] = scan_interval
     app.config["LATEST_ONLY"] = latest_only
 
+    # thumbnails are built off the index thread so updates are never held up by decoding
+    thumbs_root = os.path.join(str(root_dir), THUMBS_DIR)
+    thumb_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumb")
+
+    def _queue_thumb(item: Item):
+        thumb_pool.submit(_ensure_thumb, os.path.join(str(root_dir), item.image_rel),
+                          os.path.join(thumbs_root, item.image_rel + ".webp"))
+
+    item_index = ItemIndex(root_dir, scan_interval, on_item=_queue_thumb if HAS_PIL else None)
+    item_index.start()
+    app.config["INDEX"] = item_index
+
+    # the page only depends on scan_interval, fixed at startup: run Jinja once
+    with app.app_context():
+        app.config["INDEX_PAGE"] = render_template_string(INDEX_HTML,
+            scan_interval=app.config["SCAN_INTERVAL"],
+            page_size=PAGE_SIZE,
+        ).encode("utf-8")
+    app.config["INDEX_PAGE_GZ"] = _gzip(app.config["INDEX_PAGE"])
+
     @app.get("/")
     def index():
-        return render_template_string(INDEX_HTML,
-            scan_interval=app.config["SCAN_INTERVAL"]
-        )
-
-    @app.get("/api/items")
-    def api_items():
+        headers = {"Content-Type": "text/html; charset=utf-8", "Vary": "Accept-Encoding"}
+        if _accepts_gzip():
+            headers["Content-Encoding"] = "gzip"
+            return app.config["INDEX_PAGE_GZ"], 200, headers
+        return app.config["INDEX_PAGE"], 200, headers
+
+    @app.after_request
+    def _compress(resp):
+        """gzip dynamic JSON/HTML (paged /api/items, ...); files and streams pass through."""
+        if (resp.status_code != 200 or resp.direct_passthrough or resp.is_streamed
+                or "Content-Encoding" in resp.headers or resp.mimetype not in _GZIP_TYPES):
+            return resp
+        resp.headers["Vary"] = "Accept-Encoding"
+        if not _accepts_gzip():
+            return resp
+        data = resp.get_data()
+        if len(data) < GZIP_MIN_SIZE:
+            return resp
+        resp.set_data(_gzip(data))
+        resp.headers["Content-Encoding"] = "gzip"
+        etag = resp.headers.get("ETag")
+        if etag and etag.startswith('"'):
+            resp.headers["ETag"] = _gzip_etag(etag)   # different bytes, different strong tag
+        return resp
+
+    # /api/items (body, etag), rebuilt by one background thread instead of per request.
+    # The etag only moves when the body does; the boot stamp keeps it unique across restarts.
+    cache_lock = threading.Lock()
+    cache_ready = threading.Event()
+    subscribers: List[queue.Queue] = []   # one per open /events stream
+    # json body, first PAGE_SIZE page, etag, msgpack body, the doc itself and its -mtime keys (ascending, for bisect)
+    app.config["ITEMS_CACHE"] = {"body": b"", "body_gz": b"", "page": b"", "page_gz": b"", "etag": None,
+                                 "packed": None, "doc": None, "keys": []}
+    boot = f"{time.time_ns():x}"
+
+    def _scan_root() -> Tuple[Path, Optional[str]]:
+        """(scan_root, current_run): the newest run dir under --latest-only, else ROOT."""
         root: Path = app.config["ROOT_DIR"]
-        latest_only: bool = app.config.get("LATEST_ONLY", False)
-        scan_root = root
-        current_run = None
-        if latest_only:
+        if app.config.get("LATEST_ONLY", False):
             last_dir = _latest_run_dir(root)
             if last_dir is not None:
-                scan_root = last_dir
-                current_run = str(last_dir.relative_to(root))
-    
-        items = _collect_items(scan_root, rel_root=root)
+                return last_dir, str(last_dir.relative_to(root))
+        return root, None
+
+    def _build_items_doc(scan_root: Path, current_run: Optional[str]) -> Dict:
+        root: Path = app.config["ROOT_DIR"]
+        items = item_index.snapshot()
+        if current_run is not None:
+            prefix = current_run + os.sep
+            items = [it for it in items if it.image_rel.startswith(prefix)]
         payload = [
             {
                 "basename": it.basename,
                 "image": f"/img/{it.image_rel}",
+                "thumb": f"/thumb/{it.image_rel}",
                 "json": (f"/meta/{it.json_rel}" if it.json_rel else None),
                 "mtime": it.mtime,
                 "text": it.text,
@@ -271,31 +835,181 @@ def create_app(root_dir: Path, scan_interval: float, latest_only: bool) -> Flask
             }
             for it in items
         ]
-        return jsonify({"ok": True, "count": len(payload), "items": payload, "root": str(root), "scan_root": str(scan_root), "current_run": current_run})
+        return {"ok": True, "count": len(payload), "total": len(payload), "items": payload, "root": str(root), "scan_root": str(scan_root), "current_run": current_run}
+
+    def _refresher():
+        state = None   # (index version, current_run) the cached body was built from
+        snapshot_version = 0
+        while True:
+            version = item_index.version   # read before the snapshot: a change mid-build re-wakes us
+            try:
+                scan_root, current_run = _scan_root()
+                # idle ticks stop here: same index contents + same run dir -> same bytes
+                if (version, current_run) != state:
+                    doc = _build_items_doc(scan_root, current_run)
+                    body = _dumps_json(doc)
+                    if body != app.config["ITEMS_CACHE"]["body"]:
+                        packed = _pack_items(doc) if HAS_MSGPACK else None
+                        keys = [-it["mtime"] for it in doc["items"]]
+                        body_gz = _gzip(body)   # once per change, not per poll
+                        if len(doc["items"]) > PAGE_SIZE:   # the UI's first page
+                            page = _dumps_json(dict(doc, items=doc["items"][:PAGE_SIZE], count=PAGE_SIZE))
+                            page_gz = _gzip(page)
+                        else:
+                            page, page_gz = body, body_gz
+                        with cache_lock:
+                            snapshot_version += 1
+                            etag = f'"{boot}-{snapshot_version}"'
+                            app.config["ITEMS_CACHE"] = {"body": body, "body_gz": body_gz, "page": page,
+                                                         "page_gz": page_gz, "etag": etag, "packed": packed,
+                                                         "doc": doc, "keys": keys}
+                            for q in subscribers:
+                                try:
+                                    q.put_nowait(etag)
+                                except queue.Full:
+                                    pass   # an update is already pending for that client
+                    state = (version, current_run)
+                cache_ready.set()
+            except Exception as e:
+                print(f"[display] refresh failed: {e}")
+            # wake on index changes; the timeout also catches a new --latest-only run dir
+            item_index.wait_for_change(version, timeout=scan_interval)
+
+    threading.Thread(target=_refresher, name="display-refresher", daemon=True).start()
+
+    @app.get("/api/items")
+    def api_items():
+        """
+        Newest-first items. Optional ?since=<mtime> returns only items newer than that
+        (binary search on the sorted snapshot) and ?limit=<n> caps the count; "total"
+        is always the full snapshot size. Without ?since, the whole snapshot (no ?limit,
+        or one covering it) and the UI's first page (?limit=PAGE_SIZE) are sent pre-built.
+        """
+        cache_ready.wait()
+        with cache_lock:
+            cache = app.config["ITEMS_CACHE"]
+        etag = cache["etag"]
+        gz = _accepts_gzip()
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        # either stored copy is still current; the gzip one only for clients that can decode it
+        inm = request.headers.get("If-None-Match")
+        if inm == etag or (gz and inm == _gzip_etag(etag)):
+            headers["ETag"] = inm
+            return Response(status=304, headers=headers)
+        limit = request.args.get("limit", type=int)
+        since = request.args.get("since", type=float)
+        doc = cache["doc"]
+        items = doc["items"]
+        if since is None and (limit is None or limit >= len(items) or limit == PAGE_SIZE):
+            key = "body" if limit is None or limit >= len(items) else "page"
+            if gz:
+                headers["Content-Encoding"] = "gzip"
+                headers["ETag"] = _gzip_etag(etag)
+                return Response(cache[key + "_gz"], mimetype="application/json", headers=headers)
+            return Response(cache[key], mimetype="application/json", headers=headers)
+
+        if since is not None:
+            items = items[:bisect.bisect_left(cache["keys"], -since)]
+        if limit is not None:
+            items = items[:max(limit, 0)]
+        page = dict(doc, items=items, count=len(items))
+        return Response(_dumps_json(page), mimetype="application/json", headers=headers)
+
+    @app.get("/api/items.msgpack")
+    def api_items_msgpack():
+        """Same snapshot as /api/items, as {..., cols: [...], rows: [[...], ...]} in msgpack."""
+        if not HAS_MSGPACK:
+            abort(501)
+        cache_ready.wait()
+        with cache_lock:
+            cache = app.config["ITEMS_CACHE"]
+        etag, packed = cache["etag"][:-1] + '-mp"', cache["packed"]
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=304, headers=headers)
+        return Response(packed, mimetype="application/x-msgpack", headers=headers)
+
+    # realpath(ROOT) once; per request only ROOT/rel is resolved and prefix-checked
+    ROOT_REAL = os.path.join(os.path.realpath(root_dir), "")
+
+    @functools.lru_cache(maxsize=4096)
+    def _resolve_under_root(rel: str) -> Optional[str]:
+        """Real path of ROOT/rel, or None if it escapes ROOT (memoized)."""
+        full = os.path.realpath(os.path.join(ROOT_REAL, rel))
+        return full if full.startswith(ROOT_REAL) else None
+
+    # no exists()/is_file() pre-checks below: send_from_directory stats the file
+    # itself and raises 404 when it is missing
+
+    @app.get("/events")
+    def events():
+        """SSE stream: one `data: <etag>` message whenever /api/items changes."""
+        q: queue.Queue = queue.Queue(maxsize=1)
+        with cache_lock:
+            subscribers.append(q)
+            etag = app.config["ITEMS_CACHE"]["etag"]
+        if etag is not None:
+            q.put_nowait(etag)   # (re)connecting clients load right away
+
+        def gen():
+            try:
+                while True:
+                    try:
+                        yield f"data: {q.get(timeout=15)}\n\n"
+                    except queue.Empty:
+                        yield ": ping\n\n"   # keep-alive; also detects closed clients
+            finally:
+                with cache_lock:
+                    subscribers.remove(q)
+
+        return Response(stream_with_context(gen()), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
     @app.get("/img/<path:rel>")
     def serve_image(rel: str):
-        root: Path = app.config["ROOT_DIR"]
-        full = (root / rel).resolve()
-        if not str(full).startswith(str(root.resolve())):
+        full = _resolve_under_root(rel)
+        if full is None:
+            abort(403)
+        resp = send_from_directory(os.path.dirname(full), os.path.basename(full))
+        # the UI asks for /img/...?v=<mtime>: that URL never changes content, so the
+        # browser keeps it for good instead of re-downloading every tile on every poll
+        if "v" in request.args:
+            resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return resp
+
+    @app.get("/thumb/<path:rel>")
+    def serve_thumb(rel: str):
+        full = _resolve_under_root(rel)
+        if full is None:
             abort(403)
-        if not full.exists() or not full.is_file():
-            abort(404)
-        directory = str(full.parent)
-        filename = full.name
-        return send_from_directory(directory, filename)
+        thumb = os.path.join(ROOT_REAL, THUMBS_DIR, full[len(ROOT_REAL):] + ".webp")
+        thumb_mtime = _fast_stat_mtime(thumb)
+        src_mtime = _fast_stat_mtime(full)
+        if thumb_mtime is not None and src_mtime is not None and thumb_mtime >= src_mtime:
+            try:
+                v = float(request.args.get("v", "inf"))
+            except ValueError:
+                v = float("inf")
+            try:
+                resp = send_from_directory(os.path.dirname(thumb), os.path.basename(thumb), mimetype="image/webp")
+            except NotFound:
+                pass   # .thumbs cleared under us
+            else:
+                # ?v=<item mtime> may be newer than the thumb (JSON rewritten since): revalidate then
+                resp.headers["Cache-Control"] = ("public, max-age=31536000, immutable" if thumb_mtime >= v
+                                                 else "no-cache")
+                return resp
+        # not built / stale (yet / no Pillow): the original, revalidated so the thumb replaces it later
+        resp = send_from_directory(os.path.dirname(full), os.path.basename(full))
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp
 
     @app.get("/meta/<path:rel>")
     def serve_json(rel: str):
-        root: Path = app.config["ROOT_DIR"]
-        full = (root / rel).resolve()
-        if not str(full).startswith(str(root.resolve())):
+        full = _resolve_under_root(rel)
+        if full is None:
             abort(403)
-        if not full.exists() or not full.is_file():
-            abort(404)
-        directory = str(full.parent)
-        filename = full.name
-        return send_from_directory(directory, filename, mimetype="application/json")
+        return send_from_directory(os.path.dirname(full), os.path.basename(full), mimetype="application/json")
 
     return app
 
@@ -355,12 +1069,13 @@ INDEX_HTML = r"""
     <h1>📸 VLM Ingest Viewer</h1>
     <span class="badge" id="count">0</span>
     <div style="margin-left:auto; display:flex; gap:10px; align-items:center;">
-      <small style="color:var(--muted)">Auto-refresh <b id="interval"></b> sec</small>
+      <small style="color:var(--muted)" id="mode"></small>
       <button class="btn" id="refreshBtn">Refresh now</button>
     </div>
   </header>
 
   <main class="grid" id="grid"></main>
+  <div class="footer"><button class="btn" id="moreBtn" style="display:none">Show more</button></div>
   <div class="footer">Serving images + metadata from your ingested folder • VLM on Jetson ♥</div>
 
   <div class="modal" id="modal">
@@ -380,6 +1095,11 @@ INDEX_HTML = r"""
   <script>
     const SCAN_INTERVAL = {{ scan_interval|tojson }};
     let timer = null;
+    let lastTag = null;   // ETag of the last rendered /api/items
+    const PAGE = {{ page_size }};     // cards per page; "Show more" raises the limit
+    let limit = PAGE;
+    let shown = [];       // rendered items, newest first
+    let run;              // current_run of `shown`
 
     function fmtTime(ts){
       try { return new Date(ts*1000).toLocaleString(); } catch(e){ return String(ts); }
@@ -400,12 +1120,18 @@ INDEX_HTML = r"""
       return `<div class="chips"><span class="chips-title">${title}</span>${chips}</div>`;
     }
 
-    function render(items){
+    // versioned image URL: cached as immutable by the server, changes when the item does
+    function imgUrl(it){ return `${it.image}?v=${it.mtime}`; }
+    function thumbUrl(it){ return `${it.thumb}?v=${it.mtime}`; }
+
+    function render(items, total){
       const grid = document.getElementById('grid');
-      document.getElementById('count').textContent = items.length;
-      grid.innerHTML = items.map(it => `
-        <div class="card" onclick="openModal(${encodeURIComponent(JSON.stringify(JSON.stringify(it)))})">
-          <img class="thumb" src="${it.image}" alt="${it.basename}" />
+      document.getElementById('count').textContent = total;
+      document.getElementById('moreBtn').style.display = total > items.length ? '' : 'none';
+      window.__items = items;
+      grid.innerHTML = items.map((it, i) => `
+        <div class="card" data-idx="${i}">
+          <img class="thumb" src="${thumbUrl(it)}" alt="${it.basename}" loading="lazy" />
           <div class="body">
             <div class="title">
               <div class="basename" title="${it.basename}">${it.basename}</div>
@@ -417,34 +1143,66 @@ INDEX_HTML = r"""
             <div class="text">${cleanText(it.text)}</div>
             <div class="row">
               ${it.json ? `<a class="btn" href="${it.json}" target="_blank">Open JSON</a>` : ''}
-              <a class="btn" href="${it.image}" target="_blank">Open Image</a>
+              <a class="btn" href="${imgUrl(it)}" target="_blank">Open Image</a>
             </div>
           </div>
         </div>
       `).join('');
     }
 
-    async function load(){
+    function keyOf(it){ return it.json || it.image; }
+
+    // full=false asks only for items newer than the newest one shown and merges
+    // them in; a run switch or a removal (count mismatch) falls back to a full page
+    async function load(full){
       try{
-        const r = await fetch('/api/items');
+        const delta = !full && shown.length > 0;
+        const url = delta ? `/api/items?since=${shown[0].mtime}&limit=${limit}` : `/api/items?limit=${limit}`;
+        // the browser revalidates with If-None-Match; a 304 comes back as the cached
+        // body with the same ETag, so unchanged polls skip JSON parse + re-render
+        const r = await fetch(url);
+        const tag = r.headers.get('ETag');
+        if(tag && tag === lastTag) return;
         const js = await r.json();
-        if(js && js.ok) render(js.items);
+        if(!js || !js.ok) return;
+        let items = js.items;
+        if(delta){
+          if(js.current_run !== run) return load(true);
+          const fresh = new Set(items.map(keyOf));
+          items = items.concat(shown.filter(it => !fresh.has(keyOf(it)))).slice(0, limit);
+          if(items.length !== Math.min(js.total, limit)) return load(true);
+        }
+        shown = items; run = js.current_run; lastTag = tag;
+        render(shown, js.total);
       }catch(e){ console.error(e); }
     }
 
+    // the server pushes an event per change (and one on every (re)connect);
+    // plain polling only where EventSource is unavailable
     function start(){
-      document.getElementById('interval').textContent = SCAN_INTERVAL;
-      load();
-      timer = setInterval(load, SCAN_INTERVAL*1000);
+      const mode = document.getElementById('mode');
+      if(window.EventSource){
+        mode.textContent = 'Live';
+        new EventSource('/events').onmessage = () => load();
+      }else{
+        mode.textContent = `Auto-refresh ${SCAN_INTERVAL} sec`;
+        load();
+        timer = setInterval(() => load(), SCAN_INTERVAL*1000);
+      }
     }
 
-    function stop(){ if(timer){ clearInterval(timer); timer = null; } }
+    document.getElementById('refreshBtn').addEventListener('click', ()=>{ lastTag = null; load(true); });
+    document.getElementById('moreBtn').addEventListener('click', ()=>{ limit += PAGE; lastTag = null; load(true); });
 
-    document.getElementById('refreshBtn').addEventListener('click', ()=>{ stop(); load(); start(); });
+    // one delegated handler for all cards; links inside a card keep their own behaviour
+    document.getElementById('grid').addEventListener('click', (e)=>{
+      if(e.target.closest('a')) return;
+      const card = e.target.closest('.card');
+      if(card) openModal(window.__items[card.dataset.idx]);
+    });
 
-    async function openModal(serialized){
-      const it = JSON.parse(JSON.parse(decodeURIComponent(serialized)));
-      document.getElementById('modalImg').src = it.image;
+    async function openModal(it){
+      document.getElementById('modalImg').src = imgUrl(it);
       document.getElementById('modalTitle').textContent = it.basename + ' — ' + fmtTime(it.mtime);
 
       // LLM chips + caption (no OWL)
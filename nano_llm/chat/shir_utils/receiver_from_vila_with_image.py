@@ -1,6 +1,18 @@
 # receiver.py
+#
+# Dev server:  python receiver_from_vila_with_image.py
+# Production:  gunicorn receiver_from_vila_with_image:app -b 0.0.0.0:5000 \
+#                  -w 4 -k gthread --threads 4 --worker-tmp-dir /dev/shm
+# All state lives in SAVE_DIR, so any number of workers can share it.
 from flask import Flask, request, jsonify
-import os, json, time, base64
+import os, re, json, time, base64, shutil, threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    HAS_ORJSON=True
+except ImportError:
+    HAS_ORJSON=False
 
 app = Flask(__name__)
 
@@ -8,6 +20,26 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SAVE_DIR = os.path.join(BASE_DIR, "ingested")
 os.makedirs(SAVE_DIR, exist_ok=True)
 
+# SAVE_DIR/.by_sha256/<sha256> hardlinks to every image received with a digest,
+# so repeat turns on the same image can reference it instead of re-uploading
+# the bytes. Kept on disk (not in memory) so it is shared by gunicorn workers.
+SHA_DIR = os.path.join(SAVE_DIR, ".by_sha256")
+os.makedirs(SHA_DIR, exist_ok=True)
+_SHA_RE = re.compile(r"[0-9a-f]{64}")
+
+# image files are written off the request thread; sha256 -> Future of a write
+# that has not created its .by_sha256 link yet
+_WRITE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ingest-write")
+_PENDING_SHA = {}
+
+def _loads_json(data):
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+def _dumps_json(doc) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(doc, option=orjson.OPT_INDENT_2)
+    return json.dumps(doc, ensure_ascii=False, indent=2).encode("utf-8")
+
 def _safe_basename_from_image_path(img_path: str) -> str:
     try:
         img_path = (img_path or "").strip()
@@ -16,54 +48,138 @@ def _safe_basename_from_image_path(img_path: str) -> str:
     except Exception:
         return f"image_{int(time.time())}"
 
+def _image_path_for(img_base: str, img_ext: str) -> str:
+    ext_lower = (img_ext or ".jpg").lower()
+    if ext_lower in (".jpg", ".jpeg"):
+        return os.path.join(SAVE_DIR, f"{img_base}.jpg")
+    return os.path.join(SAVE_DIR, f"{img_base}{ext_lower}")
+
+def _tmp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def _link_or_copy(src: str, dst: str):
+    """Atomically make 'dst' a hardlink to 'src' (copy if linking is not possible)."""
+    tmp = _tmp_path(dst)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+def _write_image(img_path: str, raw: bytes, img_sha: str = None):
+    """Write 'raw' to 'img_path' (runs on _WRITE_POOL) and link it under its digest."""
+    try:
+        # write to a new inode so existing .by_sha256 links keep their old content
+        tmp = _tmp_path(img_path)
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, img_path)
+        if img_sha:
+            _link_or_copy(img_path, os.path.join(SHA_DIR, img_sha))
+    except Exception as e:
+        print(f"[ingest][error] failed to write {img_path}: {e}")
+        raise
+
+def _submit_image_write(img_path: str, raw: bytes, img_sha: str = None):
+    fut = _WRITE_POOL.submit(_write_image, img_path, raw, img_sha)
+    if img_sha:
+        _PENDING_SHA[img_sha] = fut
+        fut.add_done_callback(lambda f: _PENDING_SHA.pop(img_sha, None) if _PENDING_SHA.get(img_sha) is f else None)
+    return fut
+
+def _read_ingest_request():
+    """
+    Return (doc, img_data, img_base, img_ext, img_sha) from either request format:
+      - multipart/form-data: field 'doc' (JSON text) + file 'image' (raw bytes),
+        plus 'image_sha256'/'image_name' fields; 'image' is omitted when the
+        sender believes we already hold that digest
+      - legacy JSON body with transient _image_b64/_image_basename/_image_ext fields
+    img_data is raw bytes for multipart, the still-encoded base64 str for legacy.
+    """
+    if request.mimetype == "multipart/form-data":
+        doc = _loads_json(request.form.get("doc") or "null")
+        img_sha = (request.form.get("image_sha256") or "").lower()
+        if not _SHA_RE.fullmatch(img_sha):
+            img_sha = None
+        img_file = request.files.get("image")
+        img_name = img_file.filename if img_file is not None and img_file.filename else request.form.get("image_name")
+        if not img_name:
+            return doc, None, None, ".jpg", img_sha
+        img_base, img_ext = os.path.splitext(os.path.basename(img_name))
+        return doc, (img_file.read() if img_file is not None else None), img_base, img_ext or ".jpg", img_sha
+
+    doc = _loads_json(request.get_data(cache=False))
+    if not isinstance(doc, dict):
+        return doc, None, None, ".jpg", None
+
+    img_b64 = doc.pop("_image_b64", None)
+    img_base = doc.pop("_image_basename", None)
+    img_ext  = doc.pop("_image_ext", ".jpg") or ".jpg"
+    if not (isinstance(img_b64, str) and img_b64.strip()):
+        img_b64 = None
+    return doc, img_b64, img_base, img_ext, None
+
 @app.post("/ingest")
 def ingest():
     """
-    Accepts a JSON payload of the per-image document.
-    Optional transient fields from sender:
-      _image_b64, _image_basename, _image_ext
+    Accepts the per-image document, preferably as multipart/form-data:
+      doc=<JSON text>, image=@<basename><ext>
+    or, when the image was already uploaded, with image_sha256/image_name
+    fields in place of the file (answered with 409 if the digest is unknown).
+    The older JSON-only payload with _image_b64, _image_basename, _image_ext
+    transient fields is still understood.
     Saves:
       <basename>.json  (document without transient fields)
       <basename>.jpg   (or original extension if not jpeg)
     """
-    doc = request.get_json(force=True, silent=False)
+    try:
+        doc, img_data, img_base, img_ext, img_sha = _read_ingest_request()
+    except Exception as e:
+        return jsonify({"ok": False, "error": f"invalid request: {e}"}), 400
     if not isinstance(doc, dict):
         return jsonify({"ok": False, "error": "invalid JSON"}), 400
 
-    # Pull transient image fields (if present)
-    img_b64 = doc.pop("_image_b64", None)
-    img_base = doc.pop("_image_basename", None)
-    img_ext  = doc.pop("_image_ext", ".jpg") or ".jpg"
-
     # Determine base filename
     if not img_base:
         img_base = _safe_basename_from_image_path(doc.get("image_path") or "")
 
     # 1) Save JSON
     json_path = os.path.join(SAVE_DIR, f"{img_base}.json")
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(doc, f, ensure_ascii=False, indent=2)
+    with open(json_path, "wb") as f:
+        f.write(_dumps_json(doc))
 
     saved = {"json": os.path.abspath(json_path)}
 
-    # 2) Save image if provided
-    if isinstance(img_b64, str) and img_b64.strip():
+    # 2) Save image if provided (decoded here, written in the background)
+    if img_data:
         try:
-            raw = base64.b64decode(img_b64, validate=True)
-            ext_lower = (img_ext or ".jpg").lower()
-            if ext_lower in (".jpg", ".jpeg"):
-                img_path = os.path.join(SAVE_DIR, f"{img_base}.jpg")
-            else:
-                img_path = os.path.join(SAVE_DIR, f"{img_base}{ext_lower}")
-            with open(img_path, "wb") as f:
-                f.write(raw)
-            saved["image"] = os.path.abspath(img_path)
+            # trusted sender: skip the separate validation pass over the base64 text
+            raw = base64.b64decode(img_data) if isinstance(img_data, str) else img_data
+            img_path = os.path.abspath(_image_path_for(img_base, img_ext))
+            _submit_image_write(img_path, raw, img_sha)
+            saved["image"] = img_path
         except Exception as e:
-            saved["image_error"] = f"failed to decode/write image: {e}"
+            saved["image_error"] = f"failed to decode image: {e}"
+    elif img_sha:
+        # 2b) Image referenced by digest: reuse the copy we already saved
+        src = os.path.join(SHA_DIR, img_sha)
+        pending = _PENDING_SHA.get(img_sha)
+        if pending is not None:
+            try:
+                pending.result()
+            except Exception:
+                pass
+        if not os.path.isfile(src):
+            print(f"[ingest] unknown image_sha256 {img_sha}, asking sender for the bytes")
+            return jsonify({"ok": False, "error": "unknown image_sha256", "saved": saved}), 409
+        img_path = os.path.abspath(_image_path_for(img_base, img_ext))
+        if not (os.path.exists(img_path) and os.path.samefile(src, img_path)):
+            _link_or_copy(src, img_path)
+        saved["image"] = img_path
 
     print(f"[ingest] saved: {saved}")
     return jsonify({"ok": True, "saved": saved})
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000)
+    app.run(host="0.0.0.0", port=5000, threaded=True)
 